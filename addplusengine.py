@@ -0,0 +1,2448 @@
+# 수식 조사/맞춤법 교정 엔진 (Streamlit 화면은 addplusreporter16.py). 배치 작업은 이 모듈만 import한다
+import re
+import json
+import ast
+import bisect
+import sys
+import os
+import hashlib
+import sqlite3
+import mmap
+import threading
+import time
+from array import array
+from collections import namedtuple, Counter, OrderedDict, deque
+from itertools import chain, repeat
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 1. LaTeX 수식 토크나이저 (마지막으로 읽히는 항 추출)
+# ==========================================
+class IrregularFormula(Exception):
+    # 트리 경로로는 기존 결과를 그대로 재현할 수 없는 수식 (짝 없는 괄호, 인자 없는 \frac 등)
+    pass
+
+
+class BudgetExceeded(Exception):
+    # 수식 분석이 시간 예산(JosaCorrector.formula_budget/document_budget)을 넘김
+    pass
+
+
+class TermTooLong(BudgetExceeded):
+    # 예산이 있을 때 마지막 항이 너무 길어 분류하지 않음 (시간이 지났는지와 무관하게 길이로만 정해진다)
+    pass
+
+
+def check_deadline(deadline):
+    # deadline(time.perf_counter 기준 시각)이 지났으면 BudgetExceeded. None이면 제한 없음
+    if deadline is not None and time.perf_counter() > deadline: raise BudgetExceeded
+
+
+class LatexTermParser:
+    # 정규화된 수식을 한 번 훑어 토큰 → 괄호 트리로 만들고, 트리 위에서
+    # \frac(분자만 남김), \sqrt[n](지수 제거), 바깥 괄호 벗기기, 관계 기호 분할을 처리한다.
+    # 토큰: 명령어('\\alpha'), 기호 명령('\\,'), 일반 문자열 덩어리('x^2+1'), 그룹(list)
+    TOKEN_RE = re.compile(r'\\[a-zA-Z]+|\\[^{}]|\\|[{}]|[^\\{}]+', re.DOTALL)
+    # 문자열 덩어리 안에서 마지막 관계/연산 기호의 끝 위치
+    LAST_REL_RE = re.compile(r'.*(?:[=<>]|(?<!\^)[+\-])', re.DOTALL)
+    # 기존 split 정규식의 대안 순서 그대로 (\subset 이 \subseteq 보다 먼저 맞음)
+    RELATION_CMDS = ('approx', 'ne', 'ge', 'le', 'times', 'div', 'cdot',
+                     'cap', 'cup', 'setminus', 'subset', 'subseteq', 'in', 'ni')
+    LETTERS = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ')
+    # 정규화 때 지워지는 명령어 (\quad, \qquad, \left, \right)
+    REMOVED_CMDS = ('quad', 'qquad', 'left', 'right')
+    # 역방향 빠른 경로가 마지막 항만 봐서는 결과를 보장할 수 없는 수식:
+    # '\\', 수식 어딘가의 \sqrt[n] (가장 앞의 것 하나만 지워지므로), 두 그룹 인자가 확인되지 않는 \frac
+    _GAP = r'(?:\s|\\[,;:! ]|\\q?quad|\\left|\\right)*'
+    _GROUP3 = r'\{(?:[^{}]|\{(?:[^{}]|\{[^{}]*\})*\})*\}'  # 3단계까지 중첩된 그룹
+    FAST_PATH_GUARD_RE = re.compile(r'\\\\|\\sqrt' + _GAP + r'\[')
+    INNER_GROUP_RE = re.compile(r'\{[^{}]*\}')
+    FRAC_ARGS_RE = re.compile(r'\\frac(?=' + _GAP + _GROUP3 + _GAP + r'\{)')
+
+    def parse(self, canonical):
+        # 괄호 트리를 만들면서 \frac{분자}{분모}는 분모 그룹이 닫히는 순간 분자로 접는다
+        # (한국어 분수는 "분모 분의 분자"로 읽으므로 분자를 남김)
+        if '\\\\' in canonical: raise IrregularFormula(canonical)
+        root = []
+        stack = [root]
+        cur = root
+        spliced = None  # 방금 분자를 풀어 넣은 리스트 (다음 토큰과 이어지는지 검사)
+        for tok in self.TOKEN_RE.findall(canonical):
+            if tok == '{':
+                group = []
+                cur.append(group)
+                stack.append(group)
+                cur = group
+                spliced = None
+                continue
+            if tok == '}' and len(stack) > 1:
+                self._check_frac_done(cur)
+                stack.pop()
+                parent = stack[-1]
+                if len(parent) >= 3 and parent[-3] == '\\frac':
+                    num = parent[-2]
+                    del parent[-3:]
+                    if num and parent and self._joins(parent[-1], num[0]): raise IrregularFormula(tok)
+                    parent.extend(num)
+                    spliced = parent
+                else:
+                    spliced = None
+                cur = parent
+                continue
+            # 짝 없는 닫는 괄호('}')는 문자 그대로 남음
+            if cur:
+                last = cur[-1]
+                if last == '\\frac' or (len(cur) > 1 and cur[-2] == '\\frac'): raise IrregularFormula(tok)
+                if spliced is cur and self._joins(last, tok): raise IrregularFormula(tok)
+            if tok[0] == '\\' and tok.startswith('\\frac') and tok != '\\frac': raise IrregularFormula(tok)
+            spliced = None
+            cur.append(tok)
+        if len(stack) > 1: raise IrregularFormula(canonical)
+        self._check_frac_done(root)
+        return root
+
+    def _check_frac_done(self, nodes):
+        # 인자가 두 그룹으로 끝나지 않은 \frac 은 기존 문자열 방식이 다른 괄호를 찾아가므로 재현 불가
+        if nodes and (nodes[-1] == '\\frac' or (len(nodes) > 1 and nodes[-2] == '\\frac')):
+            raise IrregularFormula('\\frac')
+
+    def serialize(self, nodes):
+        return ''.join(t if type(t) is str else '{' + self.serialize(t) + '}' for t in nodes)
+
+    def _joins(self, prev, tok):
+        # 문자열 치환 방식에서는 '\\명령' 뒤에 영문자가 붙으면 명령어 이름이 바뀐다
+        if type(prev) is not str or type(tok) is not str or prev[0] != '\\': return False
+        if len(prev) == 1: return tok[0] in self.LETTERS or tok[0] == '\\'
+        return prev[1] in self.LETTERS and tok[0] in self.LETTERS
+
+    def _strip_sqrt_index(self, nodes):
+        # 기존 동작과 같이 가장 앞의 \sqrt 하나만 [n]을 제거한다. 찾았으면 True
+        for i, tok in enumerate(nodes):
+            if type(tok) is list:
+                if self._strip_sqrt_index(tok): return True
+                continue
+            if not tok.startswith('\\sqrt'): continue
+            if tok != '\\sqrt': raise IrregularFormula(tok)
+            if i + 1 < len(nodes) and type(nodes[i+1]) is str and nodes[i+1][0] == '[':
+                for j in range(i + 1, len(nodes)):
+                    t = nodes[j]
+                    if type(t) is list or t[0] == '\\':
+                        if ']' in (t if type(t) is str else self.serialize(t)): raise IrregularFormula(tok)
+                        continue
+                    close = t.find(']', 1 if j == i + 1 else 0)
+                    if close == -1: continue
+                    rest = t[close+1:]
+                    del nodes[i+1:j+1]
+                    if rest: nodes.insert(i + 1, rest)
+                    if i + 1 < len(nodes) and self._joins(tok, nodes[i+1]): raise IrregularFormula(tok)
+                    return True
+                raise IrregularFormula(tok)
+            return True
+        return False
+
+    def last_term(self, canonical, unwrap=True):
+        nodes = self.parse(canonical)
+        if '\\sqrt' in canonical:
+            self._strip_sqrt_index(nodes)
+        while unwrap and len(nodes) == 1 and type(nodes[0]) is list:
+            nodes = nodes[0]
+
+        # 뒤에서부터 최상위 관계/연산 기호를 찾는다 (그룹 안은 기존 @BRACE 마스킹처럼 무시)
+        for idx in range(len(nodes) - 1, -1, -1):
+            tok = nodes[idx]
+            if type(tok) is not str: continue
+            if tok[0] == '\\':
+                if len(tok) == 1: continue
+                if tok[1] in '=<>+-':
+                    return self.serialize(nodes[idx+1:])
+                if tok[1] in self.LETTERS:
+                    for rel in self.RELATION_CMDS:
+                        if tok.startswith(rel, 1):
+                            return tok[1+len(rel):] + self.serialize(nodes[idx+1:])
+                continue
+            m = self.LAST_REL_RE.match(tok)
+            if m is None: continue
+            end = m.end()
+            if end == 1 and tok[0] in '+-' and idx > 0 and type(nodes[idx-1]) is str and nodes[idx-1].endswith('^'):
+                continue
+            return tok[end:] + self.serialize(nodes[idx+1:])
+        return self.serialize(nodes)
+
+    def last_split_offset(self, formula, deadline=None):
+        # 정규화 전 수식을 끝에서부터 거꾸로 읽어, 마지막 최상위 관계/연산 기호 바로 뒤의 위치를 돌려준다.
+        # 분할 기호 없이 맨 앞까지 오면 0. 읽는 양은 마지막 항 길이에 비례하며,
+        # 공백/간격 명령 제거 등으로 분할 위치가 달라질 수 있으면 None (→ 전체 경로)
+        if not self._braces_balanced(formula, deadline) or self.FAST_PATH_GUARD_RE.search(formula):
+            return None
+        if '\\frac' in formula and formula.count('\\frac') != len(self.FRAC_ARGS_RE.findall(formula)):
+            return None
+        letters = self.LETTERS
+        depth = 0
+        n = len(formula)
+        open_pos = close_pos = n
+        i = n - 1
+        while i >= 0:
+            c = formula[i]
+            if c == '}':
+                depth += 1
+            elif c == '{':
+                depth -= 1
+                if depth < 0: return None
+            elif c in '=<>':
+                return i + 1
+            elif c in '+-':
+                prev = self._prev_canonical_char(formula, i)
+                if prev is None: return None
+                if prev != '^': return i + 1
+            elif c in letters:
+                j = i
+                while j > 0 and formula[j-1] in letters: j -= 1
+                if j > 0 and formula[j-1] == '\\':
+                    name = formula[j:i+1]
+                    if name in self.REMOVED_CMDS:
+                        if self._joins_across(formula, j - 1, i + 1): return None
+                    elif name.startswith(self.REMOVED_CMDS):
+                        return None
+                    else:
+                        for rel in self.RELATION_CMDS:
+                            if name.startswith(rel): return j + len(rel)
+                    j -= 1
+                i = j
+            elif c.isspace():
+                j = i
+                while j > 0 and formula[j-1].isspace(): j -= 1
+                if j > 0 and formula[j-1] == '\\' and formula[j] == ' ': j -= 1  # '\ ' 간격 명령
+                if self._joins_across(formula, j, i + 1): return None
+                i = j
+            elif c in ',;:!' and i > 0 and formula[i-1] == '\\':
+                if self._joins_across(formula, i - 1, i + 1): return None
+                i -= 1
+            i -= 1
+            if depth and i >= 0:
+                # 그룹 안에서는 괄호만 세면 되므로 바로 앞의 괄호로 건너뛴다
+                if open_pos > i: open_pos = formula.rfind('{', 0, i + 1)
+                if close_pos > i: close_pos = formula.rfind('}', 0, i + 1)
+                i = open_pos if open_pos > close_pos else close_pos
+        return 0 if depth == 0 else None
+
+    def _braces_balanced(self, formula, deadline=None):
+        # 괄호 짝이 맞아야 뒤에서 센 깊이 0이 앞에서 센 깊이 0과 같다 (가장 안쪽 그룹부터 지워 나간다)
+        removed = 1
+        while removed:
+            check_deadline(deadline)    # 깊게 중첩된 수식은 단계 수가 깊이만큼 (전체는 길이의 제곱)
+            formula, removed = self.INNER_GROUP_RE.subn('', formula)
+        return '{' not in formula and '}' not in formula
+
+    def _joins_across(self, formula, start, end):
+        # formula[start:end]가 정규화로 사라질 때 양옆이 이어져 명령어 이름이 달라질 수 있는가
+        if start == 0 or end >= len(formula): return False
+        left, right = formula[start-1], formula[end]
+        if not (left in self.LETTERS or left == '\\' or left.isspace()): return False
+        if right in self.LETTERS or right.isspace(): return True
+        return right == '\\' and (formula[end+1:end+2] in (',', ';', ':', '!', ' ')
+                                  or formula.startswith(self.REMOVED_CMDS, end + 1))
+
+    def _prev_canonical_char(self, formula, i):
+        # 정규화된 수식에서 formula[i] 바로 앞에 올 문자 ('+'/'-' 앞의 '^' 판정용). 애매하면 None
+        letters = self.LETTERS
+        j = i - 1
+        while j >= 0:
+            c = formula[j]
+            if c.isspace():
+                j -= 1
+                continue
+            if c == '\\':
+                # '\' 바로 뒤가 공백 한 칸이면 간격 명령(\ )으로 지워지고, 아니면 뒤 문자와 붙는다
+                if formula[j+1] == ' ':
+                    j -= 1
+                    continue
+                return c
+            if c in ',;:!' and j > 0 and formula[j-1] == '\\':
+                j -= 2
+                continue
+            if c in letters:
+                k = j
+                while k > 0 and formula[k-1] in letters: k -= 1
+                if k > 0 and formula[k-1] == '\\':
+                    name = formula[k:j+1]
+                    if name in self.REMOVED_CMDS:
+                        j = k - 2
+                        continue
+                    if name.startswith(self.REMOVED_CMDS): return None
+                elif k > 0 and formula[k-1].isspace():
+                    return None
+            return c
+        return ''
+
+
+# ==========================================
+# 2. 수식 구간 색인 ($, $$, \(..\), \[..\], \begin{equation} 등)
+# ==========================================
+# start/end는 구분자를 포함한 구간, body_start/body_end는 수식 본문
+MathSpan = namedtuple('MathSpan', ['start', 'end', 'kind', 'body_start', 'body_end'])
+
+
+class MathSpanIndex:
+    ENVIRONMENTS = ('equation', 'equation*', 'align', 'align*', 'gather', 'gather*', 'multline', 'multline*')
+    # 수식 밖에서 찾는 여는 구분자. JSON 이스케이프로 '\'가 두 번 겹친 형태(\\( 등)도 받고,
+    # 그 밖의 '\x'(\$ 포함)는 건너뛴다
+    OPEN_RE = re.compile(r'\\\\?(\(|\[|begin\{(' + '|'.join(re.escape(e) for e in ENVIRONMENTS) + r')\})'
+                         r'|\\.|(\$\$?)', re.DOTALL)
+    # 종류별 닫는 구분자 (그룹 1). 본문 시작 위치에서 match
+    CLOSE_RES = {
+        '$': re.compile(r'[^\\$]*(?:\\.[^\\$]*)*(\$)', re.DOTALL),
+        '$$': re.compile(r'[^\\$]*(?:(?:\\.|\$(?!\$))[^\\$]*)*(\$\$)', re.DOTALL),
+        '\\(': re.compile(r'[\s\S]*?(\\\\?\))'),
+        '\\[': re.compile(r'[\s\S]*?(\\\\?\])'),
+    }
+    CLOSE_RES.update({env: re.compile(r'[\s\S]*?(\\\\?end\{' + re.escape(env) + r'\})') for env in ENVIRONMENTS})
+    # UTF-8 바이트용 같은 패턴. 구분자는 모두 ASCII이고 UTF-8의 다른 바이트는 ASCII와 겹치지 않으므로 위치가 그대로 맞는다
+    OPEN_BYTES_RE = re.compile(OPEN_RE.pattern.encode('ascii'), re.DOTALL)
+    CLOSE_BYTES_RES = {kind: re.compile(close_re.pattern.encode('ascii'), close_re.flags & re.DOTALL)
+                       for kind, close_re in CLOSE_RES.items()}
+
+    def __init__(self, spans=()):
+        # spans: 시작 위치 순으로 정렬된 MathSpan 목록 (보통은 from_text로 만든다)
+        self.spans = list(spans)
+        self.starts = [span.start for span in self.spans]
+
+    @classmethod
+    def from_text(cls, text):
+        return cls(cls.iter_spans(text))
+
+    @classmethod
+    def iter_spans(cls, text):
+        # 왼쪽부터 여는 구분자를 찾고 같은 종류의 닫는 구분자와 짝짓는다. 짝이 없으면 일반 문자로 본다.
+        # text가 bytes/mmap/memoryview(UTF-8)면 바이트 위치로 돌려준다 (kind는 늘 str)
+        if isinstance(text, str):
+            open_re, close_res = cls.OPEN_RE, cls.CLOSE_RES
+        else:
+            open_re, close_res = cls.OPEN_BYTES_RE, cls.CLOSE_BYTES_RES
+        unclosed = set()   # 한 번 닫는 구분자를 못 찾은 종류는 뒤에서도 못 찾는다
+        pos = 0
+        while True:
+            m = open_re.search(text, pos)
+            if m is None: break
+            cmd, env, dollars = m.group(1, 2, 3)
+            if not isinstance(text, str):
+                cmd, env, dollars = (g.decode('ascii') if g else g for g in (cmd, env, dollars))
+            kind = dollars or env or (cmd and '\\' + cmd)
+            body_start = m.end()
+            if not kind:
+                pos = body_start
+                continue
+            close = None if kind in unclosed else close_res[kind].match(text, body_start)
+            if close is None:
+                unclosed.add(kind)
+                # 짝 없는 '$$'는 두 번째 '$'부터 한 개짜리로 다시 본다
+                pos = m.start() + 1 if kind == '$$' else body_start
+                continue
+            pos = close.end()
+            yield MathSpan(m.start(), pos, kind, body_start, close.start(1))
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def span_at(self, offset):
+        # offset을 포함하는 수식 구간, 없으면 None (이분 탐색)
+        i = bisect.bisect_right(self.starts, offset) - 1
+        if i >= 0 and offset < self.spans[i].end:
+            return self.spans[i]
+        return None
+
+    def is_math(self, offset):
+        return self.span_at(offset) is not None
+
+    def split(self, text):
+        # re.split(r'(수식)', text)처럼 [글, 수식, 글, 수식, ..., 글]로 나눈다
+        parts = []
+        pos = 0
+        for span in self.spans:
+            parts.append(text[pos:span.start])
+            parts.append(text[span.start:span.end])
+            pos = span.end
+        parts.append(text[pos:])
+        return parts
+
+    def shifted(self, edits):
+        # 수식 밖에서 일어난 치환 [(위치, 길이 변화), ...] (위치 순)을 반영한 새 색인
+        spans = []
+        delta = 0
+        k = 0
+        for span in self.spans:
+            while k < len(edits) and edits[k][0] <= span.start:
+                delta += edits[k][1]
+                k += 1
+            if delta:
+                span = MathSpan(span.start + delta, span.end + delta, span.kind,
+                                span.body_start + delta, span.body_end + delta)
+            spans.append(span)
+        return MathSpanIndex(spans)
+
+    def kind_counts(self):
+        return Counter(span.kind for span in self.spans)
+
+
+class LazyMathSpanIndex(MathSpanIndex):
+    # 앞에서부터 필요한 만큼만 구간을 찾아 채우는 색인 (끝까지 보지 않고 멈출 수 있는 검사용).
+    # 찾는 순서와 결과는 from_text와 같다
+    def __init__(self, text):
+        super().__init__()
+        self._pending = self.iter_spans(text)
+
+    def _fill(self, offset=float('inf')):
+        # offset 뒤에서 시작하는 구간이 나오거나 글이 끝날 때까지 읽는다
+        while self._pending is not None and (not self.starts or self.starts[-1] <= offset):
+            span = next(self._pending, None)
+            if span is None:
+                self._pending = None
+                break
+            self.spans.append(span)
+            self.starts.append(span.start)
+
+    def __len__(self):
+        self._fill()
+        return len(self.spans)
+
+    def __iter__(self):
+        i = 0
+        while True:
+            if i == len(self.spans):
+                self._fill(self.starts[-1] if self.starts else -1)
+                if i == len(self.spans): return
+            yield self.spans[i]
+            i += 1
+
+    def span_at(self, offset):
+        self._fill(offset)
+        return super().span_at(offset)
+
+    def split(self, text):
+        self._fill()
+        return super().split(text)
+
+    def shifted(self, edits):
+        self._fill()
+        return super().shifted(edits)
+
+    def kind_counts(self):
+        self._fill()
+        return super().kind_counts()
+
+
+# 원문 [start, end)를 replacement로 바꾸는 편집 하나. rule은 편집을 낸 규칙
+# ('formula_josa', 'formula_period', 'typo', 'word_josa', 겹쳐서 합친 편집은 '+'로 잇는다)
+Edit = namedtuple('Edit', ['start', 'end', 'replacement', 'rule'])
+
+
+def apply_edits(text, edits, out=None):
+    # 위치 순으로 겹치지 않는 편집들을 한 번 훑으며 적용한다.
+    # out(write가 있는 버퍼/파일)을 주면 거기에 써 나가고, 없으면 문자열로 돌려준다
+    pieces = []
+    write = pieces.append if out is None else out.write
+    pos = 0
+    for start, end, replacement, _ in edits:
+        write(text[pos:start])
+        write(replacement)
+        pos = end
+    write(text[pos:])
+    if out is None: return "".join(pieces)
+
+
+def compose_edits(text, first, second):
+    # second는 first를 text에 적용한 글 기준의 편집. 둘을 text 기준 편집 하나의 목록으로 합친다 (둘 다 위치 순).
+    # 중간 글에서 겹치는 편집들은 하나로 합치고, 닿기만 하는 편집은 따로 둔다
+    items = []      # (중간 글 시작, 끝, 0=first/1=second, 편집)
+    shift = 0
+    for edit in first:
+        start = edit.start + shift
+        items.append((start, start + len(edit.replacement), 0, edit))
+        shift += len(edit.replacement) - (edit.end - edit.start)
+    items.extend((edit.start, edit.end, 1, edit) for edit in second)
+    items.sort(key=lambda item: item[:3])
+    composed = []
+    shift = 0       # 지나온 first 편집들의 길이 변화 (중간 글 위치 - text 위치)
+    k = 0
+    while k < len(items):
+        start, end, which, edit = items[k]
+        group = [items[k]]
+        k += 1
+        while k < len(items) and items[k][0] < end:
+            group.append(items[k])
+            end = max(end, items[k][1])
+            k += 1
+        if len(group) == 1:
+            if which == 0:
+                composed.append(edit)
+                shift += len(edit.replacement) - (edit.end - edit.start)
+            else:
+                composed.append(edit._replace(start=edit.start - shift, end=edit.end - shift))
+            continue
+        firsts = [item[3] for item in group if item[2] == 0]
+        seconds = [item[3] for item in group if item[2] == 1]
+        orig_start = start - shift
+        shift += sum(len(e.replacement) - (e.end - e.start) for e in firsts)
+        orig_end = end - shift
+        middle = apply_edits(text[orig_start:orig_end],
+                             [e._replace(start=e.start - orig_start, end=e.end - orig_start) for e in firsts])
+        replacement = apply_edits(middle, [e._replace(start=e.start - start, end=e.end - start) for e in seconds])
+        rule = '+'.join(dict.fromkeys(item[3].rule for item in group))
+        composed.append(Edit(orig_start, orig_end, replacement, rule))
+    return composed
+
+
+class FindingLog:
+    # 교정 기록을 열(column)로 모아 둔다. 문맥을 만들 글의 번호와 (시작, 끝)은 array에, 대상/원문/수정/사유는
+    # 같은 문자열을 한 번만 두고 번호로 가리킨다. '문맥'은 행을 꺼낼 때(표시/내보내기)에야 만든다.
+    # 행은 예전 기록과 같은 dict {'문맥', '대상', '원문', '수정', '사유'}로 꺼내진다.
+    # 예전에 돌려주던 dict의 list 대신 쓰며, 읽기는 list와 같다: len, 인덱스(음수, 범위 밖이면 IndexError),
+    # 슬라이스(dict의 list), 순회, 참/거짓. append, +, ==처럼 list를 바꾸거나 견주는 쓰임은 list(log)로 바꿔서 한다
+    COLUMNS = ['문맥', '대상', '원문', '수정', '사유']
+
+    def __init__(self):
+        self.texts = []             # 문맥을 만들 글 (기록이 있는 글만 잡아 둔다)
+        self._text_ids = {}         # id(글) -> 번호 (texts가 글을 잡고 있으므로 id가 바뀌지 않는다)
+        self.strings = []           # 대상/원문/수정/사유 문자열 표
+        self._string_ids = {}
+        self.text_id = array('i')
+        self.start = array('q')     # -1이면 texts[text_id]가 이미 만든 문맥 (캐시에서 읽은 행)
+        self.end = array('q')
+        self.target = array('i')
+        self.original = array('i')
+        self.fix = array('i')
+        self.reason = array('i')
+
+    @classmethod
+    def from_rows(cls, rows):
+        # 문맥까지 만든 dict 행들 (SQLiteCache에서 읽은 결과 등)
+        log = cls()
+        for row in rows:
+            log._add(log._text(row["문맥"]), -1, -1, row["대상"], row["원문"], row["수정"], row["사유"])
+        return log
+
+    def add(self, text, start, end, target, original, fix, reason):
+        # 문맥은 text[start:end] 앞뒤 10글자 (make_context). text는 기록이 살아 있는 동안 잡아 둔다
+        texts = self.texts
+        text_id = len(texts) - 1 if texts and texts[-1] is text else self._text(text)
+        self._add(text_id, start, end, target, original, fix, reason)
+
+    def add_excerpt(self, text, start, end, target, original, fix, reason, window=10):
+        # 교정 중에 잠깐 만든 글(본문 조각 등)은 통째로 잡지 않고 문맥에 쓸 부분만 잘라 둔다
+        s = max(0, start - window)
+        self.texts.append(text[s:end + window])
+        self._add(len(self.texts) - 1, start - s, end - s, target, original, fix, reason)
+
+    def _text(self, text):
+        text_id = self._text_ids.get(id(text))
+        if text_id is None:
+            text_id = self._text_ids[id(text)] = len(self.texts)
+            self.texts.append(text)
+        return text_id
+
+    def _string(self, value):
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self.strings)
+            self.strings.append(value)
+        return string_id
+
+    def _add(self, text_id, start, end, target, original, fix, reason):
+        self.text_id.append(text_id)
+        self.start.append(start)
+        self.end.append(end)
+        self.target.append(self._string(target))
+        self.original.append(self._string(original))
+        self.fix.append(self._string(fix))
+        self.reason.append(self._string(reason))
+
+    def __len__(self):
+        return len(self.text_id)
+
+    @property
+    def total(self):
+        return len(self.text_id)
+
+    def __getitem__(self, i):
+        rows = range(len(self))[i]      # 음수, 범위 밖, 슬라이스를 list와 똑같이 다룬다
+        if isinstance(rows, range): return [self[k] for k in rows]
+        i = rows
+        strings = self.strings
+        return {
+            "문맥": self.context(i),
+            "대상": strings[self.target[i]],
+            "원문": strings[self.original[i]],
+            "수정": strings[self.fix[i]],
+            "사유": strings[self.reason[i]]
+        }
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def context(self, i, window=10):
+        return self.make_context(self.texts[self.text_id[i]], self.start[i], self.end[i], window)
+
+    @staticmethod
+    def make_context(text, start, end, window=10):
+        if start < 0: return text
+        s = max(0, start - window)
+        e = min(len(text), end + window)
+        context = text[s:e].replace('\n', ' ')
+        return f"...{context}..."
+
+    def reason_counts(self):
+        return Counter(self.strings[reason] for reason in self.reason)
+
+    def summary(self, sample_size=3):
+        # 모아 둔 기록 전체를 FindingSummary로 묶는다 (문맥은 예시로 남길 것만 만든다)
+        summary = FindingSummary(sample_size)
+        strings, texts = self.strings, self.texts
+        for i in range(len(self)):
+            summary.add(texts[self.text_id[i]], self.start[i], self.end[i], strings[self.target[i]],
+                        strings[self.original[i]], strings[self.fix[i]], strings[self.reason[i]])
+        return summary
+
+    def to_frame(self):
+        # UI가 쓰는 ['문맥', '대상', '원문', '수정', '사유'] 표. 문맥은 여기서 한꺼번에 만든다.
+        # pandas는 표가 필요할 때만 읽는다 (배치 작업이나 GIL 없는 빌드에서 C 확장을 읽지 않도록)
+        import pandas as pd
+        strings = self.strings
+        return pd.DataFrame({
+            "문맥": [self.context(i) for i in range(len(self))],
+            "대상": [strings[k] for k in self.target],
+            "원문": [strings[k] for k in self.original],
+            "수정": [strings[k] for k in self.fix],
+            "사유": [strings[k] for k in self.reason],
+        }, columns=self.COLUMNS)
+
+
+class FindingSummary:
+    # FindingLog 대신 기록을 받아, (사유, 대상, 원문, 수정)이 같은 기록을 한 행으로 묶고 횟수와
+    # 처음 sample_size개의 자리 (글 번호, 시작, 끝)만 남긴다. 메모리는 나온 횟수가 아니라 서로 다른 오류 수에 비례한다.
+    # 예시 자리의 글은 FindingLog처럼 잡아 두고 '문맥'은 행을 꺼낼 때 만든다.
+    # 나온 자리 전부가 필요하면 FindingLog로 다시 돌린다 (FindingLog.summary()로 언제든 묶을 수 있다)
+    COLUMNS = FindingLog.COLUMNS + ['횟수']
+
+    def __init__(self, sample_size=3):
+        self.sample_size = sample_size
+        self.texts = []         # 예시 자리의 글 (예시로 남긴 글만 잡아 둔다)
+        self._text_ids = {}     # id(글) -> 번호
+        self.groups = {}        # (사유, 대상, 원문, 수정) -> [횟수, [(글 번호, 시작, 끝) ...]]
+        self.total = 0          # 묶기 전 기록 수
+
+    def add(self, text, start, end, target, original, fix, reason):
+        samples = self._count(reason, target, original, fix)
+        if samples is not None:
+            text_id = self._text_ids.get(id(text))
+            if text_id is None:
+                text_id = self._text_ids[id(text)] = len(self.texts)
+                self.texts.append(text)
+            samples.append((text_id, start, end))
+
+    def add_excerpt(self, text, start, end, target, original, fix, reason, window=10):
+        # 잠깐 만든 글(본문 조각 등)은 예시로 남길 때만 문맥에 쓸 부분을 잘라 둔다 (FindingLog.add_excerpt와 같음)
+        samples = self._count(reason, target, original, fix)
+        if samples is not None:
+            s = max(0, start - window)
+            self.texts.append(text[s:end + window])
+            samples.append((len(self.texts) - 1, start - s, end - s))
+
+    def _count(self, reason, target, original, fix):
+        # 횟수를 세고, 예시를 더 남길 자리가 있으면 그 예시 목록 (없으면 None)
+        key = (reason, target, original, fix)
+        group = self.groups.get(key)
+        if group is None: group = self.groups[key] = [0, []]
+        group[0] += 1
+        self.total += 1
+        return group[1] if len(group[1]) < self.sample_size else None
+
+    def __len__(self):
+        return len(self.groups)
+
+    def _rows(self):
+        # 많이 나온 오류부터 (횟수가 같으면 처음 나온 순서)
+        return sorted(self.groups.items(), key=lambda item: -item[1][0])
+
+    def __iter__(self):
+        # '문맥'은 예시 자리들의 문맥을 ' / '로 이은 것
+        for (reason, target, original, fix), (count, samples) in self._rows():
+            yield {
+                "문맥": " / ".join(self.context(sample) for sample in samples),
+                "대상": target,
+                "원문": original,
+                "수정": fix,
+                "사유": reason,
+                "횟수": count
+            }
+
+    def context(self, sample, window=10):
+        text_id, start, end = sample
+        return FindingLog.make_context(self.texts[text_id], start, end, window)
+
+    def locations(self):
+        # 행마다 (__iter__와 같은 순서) 예시 자리 [(글, 시작, 끝) ...]. 글은 add로 받은 글 그대로이거나
+        # (add_excerpt, 캐시에서 읽은 행이면) 그 문맥을 만든 조각이다. 시작이 -1이면 글이 이미 만든 문맥
+        return [[(self.texts[text_id], start, end) for text_id, start, end in samples] for _, (_, samples) in self._rows()]
+
+    def reason_counts(self):
+        counts = Counter()
+        for (reason, _, _, _), (count, _) in self.groups.items(): counts[reason] += count
+        return counts
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(list(self), columns=self.COLUMNS)
+
+
+# ==========================================
+# 3. 수식 조사 호응 교정 클래스 (LaTeX 대상)
+# ==========================================
+def frozen_table(table):
+    # 규칙 표의 읽기 전용 사본 (dict -> MappingProxyType, set -> frozenset, list -> tuple).
+    # 교정기는 표를 늘 이렇게 바꿔 끼우므로, 지문과 파생 구조(트라이, 오토마톤 ...)는 표가 같은 객체인지만 보면 된다
+    if isinstance(table, (dict, MappingProxyType)): return MappingProxyType(dict(table))
+    if isinstance(table, (set, frozenset)): return frozenset(table)
+    return tuple(table)
+
+
+# 받침 사전 기본값. JosaCorrector(수식 대상 판정)와 SpellingCorrector(글자 속성 표)가 함께 읽는 읽기 전용 표
+DEFAULT_BATCHIM_DICT = MappingProxyType({
+    '0': True, '1': True, '3': True, '6': True, '7': True, '8': True, '10': True,
+    'l': True, 'm': True, 'n': True, 'r': True,
+    'L': True, 'M': True, 'N': True, 'R': True,
+    '제곱': True, '여집합': True, '바': False,
+    '프라임': True,
+    # 그리스 문자 발음에 따른 받침 유무 사전
+    'alpha': False, 'beta': False, 'gamma': False, 'delta': False, 'epsilon': True, 'varepsilon': True,
+    'zeta': False, 'eta': False, 'theta': False, 'iota': False, 'kappa': False, 'lambda': False,
+    'mu': False, 'nu': False, 'xi': False, 'pi': False, 'rho': False, 'sigma': False, 'tau': False,
+    'upsilon': True, 'phi': False, 'varphi': False, 'chi': False, 'psi': False, 'omega': False,
+    'Gamma': False, 'Delta': False, 'Theta': False, 'Lambda': False, 'Xi': False, 'Pi': False,
+    'Sigma': False, 'Upsilon': True, 'Phi': False, 'Psi': False, 'Omega': False,
+    # 한글 자음은 받침 있음, 위에 없는 한 글자 숫자/영문자는 받침 없음
+    'ㄱ': True, 'ㄴ': True, 'ㄷ': True, 'ㄹ': True, 'ㅁ': True, 'ㅂ': True, 'ㅅ': True,
+    'ㅇ': True, 'ㅈ': True, 'ㅊ': True, 'ㅋ': True, 'ㅌ': True, 'ㅍ': True, 'ㅎ': True,
+    '2': False, '4': False, '5': False, '9': False, 'A': False, 'a': False, 'B': False, 'b': False, 'C': False, 'c': False,
+    'D': False, 'd': False, 'E': False, 'e': False, 'F': False, 'f': False, 'G': False, 'g': False, 'H': False, 'h': False,
+    'I': False, 'i': False, 'J': False, 'j': False, 'K': False, 'k': False, 'O': False, 'o': False, 'P': False, 'p': False,
+    'Q': False, 'q': False, 'S': False, 's': False, 'T': False, 't': False, 'U': False, 'u': False, 'V': False, 'v': False,
+    'W': False, 'w': False, 'X': False, 'x': False, 'Y': False, 'y': False, 'Z': False, 'z': False
+})
+
+
+class CharProps:
+    # 글자별 속성 비트 표 (받침/ㄹ 받침/종류). 코드 포인트로 바로 찾는 읽기 전용 bytes라 프로세스 간에도 공유된다
+    HAS_BATCHIM = 1
+    RIEUL = 2
+    HANGUL = 4      # 가-힣 음절
+    DIGIT = 8
+    LATIN = 16
+    JAMO = 32       # ㄱ-ㅎ
+    CIRCLED = 64    # ㉠-㉭ (자음 이름 기역, 니은, ...으로 읽으므로 늘 받침이 있고 ㉣만 ㄹ 받침. 수식 대상은 hangul_as_words일 때만)
+    COMMAND = 128   # 그리스 문자 등 명령어 이름 (names 쪽에만 있음)
+    _shared = {}
+
+    def __init__(self, batchim_dict=None):
+        batchim_dict = batchim_dict or {}
+        singles = [k for k in batchim_dict if len(k) == 1]
+        table = bytearray(max([0xD7A4] + [ord(k) + 1 for k in singles]))
+        for code in range(0xAC00, 0xD7A4):
+            final = (code - 0xAC00) % 28
+            table[code] = self.HANGUL | (self.HAS_BATCHIM if final else 0) | (self.RIEUL if final == 8 else 0)
+        for ch in '0123456789': table[ord(ch)] = self.DIGIT
+        for ch in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ': table[ord(ch)] = self.LATIN
+        for code in range(ord('ㄱ'), ord('ㅎ') + 1): table[code] = self.JAMO
+        for code in range(ord('㉠'), ord('㉭') + 1): table[code] = self.CIRCLED | self.HAS_BATCHIM
+        for ch in '178LRlrㄹ㉣': table[ord(ch)] |= self.RIEUL
+        # 받침 사전의 한 글자 항목이 계산값보다 우선
+        for k in singles:
+            table[ord(k)] = (table[ord(k)] & ~self.HAS_BATCHIM) | (self.HAS_BATCHIM if batchim_dict[k] else 0)
+        self.table = bytes(table)
+        self.names = {k: (self.COMMAND if k.isascii() and k.isalpha() else 0) | (self.HAS_BATCHIM if v else 0)
+                      for k, v in batchim_dict.items() if len(k) > 1}
+
+    @classmethod
+    def shared(cls, batchim_dict=None):
+        # 같은 받침 사전이면 표를 하나만 만들어 모든 교정기가 함께 쓴다
+        key = frozenset(batchim_dict.items()) if batchim_dict else None
+        props = cls._shared.get(key)
+        if props is None:
+            props = cls._shared[key] = cls(batchim_dict)
+        return props
+
+    def char_bits(self, ch):
+        code = ord(ch)
+        return self.table[code] if code < len(self.table) else 0
+
+    def bits(self, word):
+        # 한 글자는 표에서, 여러 글자는 names에 있으면 그 값, 없으면 마지막 글자 기준
+        if len(word) == 1:
+            code = ord(word)
+            return self.table[code] if code < len(self.table) else 0
+        bits = self.names.get(word)
+        if bits is not None: return bits
+        return self.char_bits(word[-1]) & (self.HAS_BATCHIM | self.RIEUL) if word else 0
+
+    def has_batchim(self, word):
+        return self.bits(word) & self.HAS_BATCHIM != 0
+
+    def is_rieul(self, word):
+        return self.bits(word) & self.RIEUL != 0
+
+
+class PrefixTrie:
+    # 보호 단어용 접두사 트라이. 단어 수와 상관없이 조사 앞부분을 한 번만 따라가며 확인한다
+    def __init__(self, words=()):
+        self.root = {}
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        if not word: return
+        node = self.root
+        for ch in word:
+            node = node.setdefault(ch, {})
+        if '' not in node:
+            node[''] = word     # 빈 문자열 키 = 단어 끝
+            self.size += 1
+
+    def longest_prefix(self, text, start=0):
+        # text[start:]의 앞부분과 일치하는 가장 긴 단어, 없으면 None
+        node = self.root
+        found = None
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None: break
+            if '' in node: found = node['']
+        return found
+
+    def __len__(self):
+        return self.size
+
+
+class ParticleTable:
+    # (받침 분류, 조사 앞부분) -> 고친 조사. particle_pairs 순서상 처음 맞는 쌍을 트라이 노드마다 미리 정해 둔다
+    def __init__(self, pairs):
+        self.root = {}
+        firsts = {}     # 쌍의 문자열 -> 그 문자열을 가진 가장 앞 쌍의 번호
+        for i, (has_b, no_b) in enumerate(pairs):
+            for word in (has_b, no_b):
+                firsts.setdefault(word, i)
+                node = self.root
+                for ch in word:
+                    node = node.setdefault(ch, {})
+        self._fill(self.root, '', None, pairs, firsts)
+
+    @staticmethod
+    def target_class(has_batchim, is_rieul):
+        return (2 if has_batchim else 0) + (1 if is_rieul else 0)
+
+    def _fill(self, node, path, best, pairs, firsts):
+        # best: path의 앞부분 중 하나와 맞는 쌍 가운데 가장 앞 번호
+        i = firsts.get(path)
+        if i is not None and (best is None or i < best): best = i
+        if best is not None:
+            has_b, no_b = pairs[best]
+            matched = has_b if path.startswith(has_b) else no_b
+            if has_b == '으로':
+                stems = ('로', '로', '으로', '로')
+            else:
+                stems = (no_b, no_b, has_b, has_b)
+            # 빈 문자열 키 = 이 경로에서 정해진 결과 (먹는 길이, 분류별 조사, 대상에 따라 바뀔 수 있는지)
+            node[''] = (len(matched), stems, any(stem != matched for stem in stems))
+        for ch, child in node.items():
+            if ch: self._fill(child, path + ch, best, pairs, firsts)
+
+    def resolve(self, particle, target_class):
+        # 트라이 깊이(가장 긴 쌍 문자열)만큼만 따라가므로 조사 하나당 비용이 일정하다
+        node = self.root
+        for ch in particle:
+            child = node.get(ch)
+            if child is None: break
+            node = child
+        entry = node.get('')
+        if entry is None: return particle
+        consumed, stems, variable = entry
+        return stems[target_class] + particle[consumed:]
+
+    def can_change(self, particle):
+        # 어떤 대상이 와도 그대로인 조사('의', '에서', '이다' 등)면 False - 대상 분석을 건너뛰는 데 쓴다
+        node = self.root
+        for ch in particle:
+            child = node.get(ch)
+            if child is None: break
+            node = child
+        entry = node.get('')
+        return entry is not None and entry[2]
+
+
+class LRUCache:
+    # 항목 수(max_entries)나 대략적인 메모리 크기(max_bytes, sys.getsizeof 합)로 제한하는 LRU 캐시.
+    # 여러 스레드가 함께 써도 되도록 잠금으로 감싸고, 적중/실패/밀려남 횟수를 센다
+    def __init__(self, max_entries=4096, max_bytes=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        with self.lock:
+            if key in self.entries:
+                self.size_bytes -= sys.getsizeof(key) + sys.getsizeof(self.entries.pop(key))
+            self.entries[key] = value
+            self.size_bytes += size
+            while self.entries and (len(self.entries) > self.max_entries or
+                                    (self.max_bytes is not None and self.size_bytes > self.max_bytes)):
+                old_key, old_value = self.entries.popitem(last=False)
+                self.size_bytes -= sys.getsizeof(old_key) + sys.getsizeof(old_value)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"entries": len(self.entries), "bytes": self.size_bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+
+class JosaCorrector:
+    # 마지막 항을 자르는 관계/연산 기호
+    SPLIT_RE = re.compile(r'=|\\approx|\\ne|>|<|\\ge|\\le|\\times|\\div|'
+                          r'(?<!\^)\+|(?<!\^)-|\\cdot|'
+                          r'\\cap|\\cup|\\setminus|\\subset|\\subseteq|\\in|\\ni')
+    BRACE_RE = re.compile(r'[{}]')
+    PARTICLE_RUN_RE = re.compile(r'[가-힣\s.?!]+')
+    GAP_BODY_RE = re.compile(r'(?:\\[a-zA-Z]+|\\.|\s)*', re.DOTALL)
+    # 정규화/마지막 항 분류/사람이 읽는 형태 변환에 쓰는 정규식 (모듈을 읽을 때 한 번만 컴파일)
+    SPACING_RE = re.compile(r'\\[,;:! ]|\\quad|\\qquad')
+    WHITESPACE_RE = re.compile(r'\s+')
+    CLOSING_BARS_END_RE = re.compile(r'(?:\\vert|\\rVert|\\rangle|\\rceil|\\rfloor|\|)+$')
+    CLOSERS_SPACE_END_RE = re.compile(r'[\}\)\]\s]+$')
+    PRIME_END_RE = re.compile(r"['’]+$")
+    DOUBLE_COMMA_END_RE = re.compile(r",{2,}$")
+    ESCAPED_BRACES_END_RE = re.compile(r'(?:\\[\}])+$')
+    CLOSERS_END_RE = re.compile(r'[\}\)\]]+$')
+    COMMAND_END_RE = re.compile(r'\\([a-zA-Z]+)$')
+    PUNCT_END_RE = re.compile(r'[\s,;:!]+$')
+    BRACES_END_RE = re.compile(r'(?:\\[\}]|\})*\s*$')
+    ALNUM_RUN_RE = re.compile(r'^[a-zA-Z0-9]+$')
+    TEXT_CMD_RE = re.compile(r'\\(?:mathrm|text|rm|bf|it)\{([a-zA-Z]+)\}')
+    SUB_GROUP_END_RE = re.compile(r'_\{([^}]+)\}(?:\\[\}]|\})*\s*$')
+    LAST_CHAR_END_RE = re.compile(r'([가-힣a-zA-Z0-9])\s*$')
+    # 예전 '_((?:\\[a-zA-Z]+|.)*?)...'와 매치가 같다 ('.'이 \명령도 덮으므로). 명령어를 나누는 방법이 여러 가지라
+    # 되돌아가기가 명령어 수의 지수 시간이던 것을 없앤다
+    SUB_CHAR_END_RE = re.compile(r'_(.*?)([a-zA-Z0-9])(?:\\[\}]|\})*\s*$')
+    PAREN_CHAR_END_RE = re.compile(r'([가-힣a-zA-Z0-9])\)+$')
+    LETTERS_END_RE = re.compile(r'([a-zA-Z]+)$')
+    COMMAND_RE = re.compile(r'\\[a-zA-Z]+')
+    SYMBOLS_RE = re.compile(r'[{}[\](),;:!\\]')
+    ALNUM_RE = re.compile(r'[a-zA-Z0-9]')
+    HUMAN_CMD_RE = re.compile(r'\\(left|right|mathrm|text|bf|it)')
+    FORMULA_PUNCT_END_RE = re.compile(r'(?<!\\)[,.;:]+$')
+    HANGUL_RUN_RE = re.compile(r'[가-힣]+')
+    TARGET_CACHE_SIZE = 4096
+    FORMULA_CACHE_SIZE = 4096
+    # 시간 예산이 있을 때 이보다 긴 마지막 항은 분류하지 않고 간이 판정한다
+    # (끝에 닿는 정규식의 search는 항 길이의 제곱 시간이고, 한 번의 실행은 중간에 끊을 수 없다)
+    BUDGET_TERM_LENGTH = 1000
+    # 예산을 넘긴 수식은 정규화한 수식의 끝 이만큼만 분석한다
+    FALLBACK_TAIL_LENGTH = 200
+
+    def __init__(self, hangul_as_words=False):
+        self.log = FindingLog()
+        self.fallback_log = FindingLog()
+        self.math_spans = MathSpanIndex()
+        self.prefilter_stats = Counter()
+        # 한 글자 한글 대상을 본문 낱말처럼 읽을지 (SpellingCorrector와 같은 판정). 기본값 False는 예전 판정 그대로:
+        # ㄹ 받침 음절도 '으로', ㉠-㉭은 받침 사전에 있을 때만 받침. True면 $달$로, $㉠$은, $㉣$로
+        self.hangul_as_words = hangul_as_words
+        # 규칙 표는 읽기 전용 (frozen_table). 바꿀 때는 add_protected_words/set_tables로 새 표를 바꿔 끼운다
+        self.batchim_dict = DEFAULT_BATCHIM_DICT
+        self.unit_batchim_dict = frozen_table(self._init_unit_batchim_dict())
+        self.char_props = CharProps.shared(self.batchim_dict)
+        self.particle_pairs = frozen_table(self._init_particle_pairs())
+        self.particle_table = ParticleTable(self.particle_pairs)
+        self._target_props = {}
+        self.term_parser = LatexTermParser()
+        # 같은 수식($x$, $f(x)$, $a_n$ ...)이 되풀이되므로 정규화한 수식 -> 대상을 기억해 둔다
+        self.target_cache = LRUCache(self.FORMULA_CACHE_SIZE)
+        self.persistent_cache = None    # SQLiteCache (CorrectionPipeline(cache_path=...)가 연결)
+        self._fingerprint = (None, None)
+        # 시간 예산(초, None이면 제한 없음). 수식 하나의 대상 분석이 formula_budget을, 글 하나의 수식 분석 전체가
+        # document_budget을 넘기면 그 수식(글이면 남은 수식 모두)은 끝부분만 분석해 판정한다.
+        # 간이 판정은 조사가 바뀌든 그대로이든 모두 fallback_log(오류가 아닌 기록)에 남기고, 바뀐 것만 오류 기록에도 남긴다
+        self.formula_budget = None
+        self.document_budget = None
+        
+        # [수식 보호] 조사가 아닌 단어(동사/형용사 활용형) 및 지시대명사 보호 목록
+        self.protected_words = [
+            '이다', '입니다', '이므로', '이며', '이고', '이나', '이면서', '이지만', '이어서',
+            '이때', '이어야', '가지',
+            '이면', 
+            '이상', '이하', '이내', '이외', '미만', '초과',
+            '이은', '이을', '이어', '이으므로', '이어진', '이루어진', '이루는', '이동', '이용',
+            '없는', '있는', '없고', '있고', '없이', '있어', '없어',
+            # 지시어 보호 패턴
+            '이 점', '이 선', '이 값', '이 식', '이 경우', '이 때', '이 확률', '이 시행', '이 도형', '이 문제',
+            '이 등식', '이 방정식', '이 부등식', '이 함수', '이 그래프', '이 조건',  '이 직선', '이 곡선', '이 영역',
+            '이 삼각형', '이 타원', '이 원', '이 사각형', '이 다각형', '이 구', '이 원뿔', '이 원기둥', '이 수열',
+            '그 점', '그 선', '그 값', '그 식', '그 경우', '그 때',
+            '저 점', '이 배터리', '그 배터리', '저 배터리'
+        ]
+        self.protected_words = frozen_table(self.protected_words)
+        self.protected_trie = PrefixTrie(self.protected_words)
+
+    def add_protected_words(self, words):
+        # 새 목록과 트라이를 만든 뒤 한 번에 바꿔 끼운다 (다른 스레드가 읽는 중인 표는 건드리지 않음)
+        trie = PrefixTrie(self.protected_words)
+        added = []
+        for word in words:
+            if word and trie.longest_prefix(word) != word:
+                added.append(word)
+                trie.add(word)
+        if added:
+            self.protected_words = self.protected_words + tuple(added)
+            self.protected_trie = trie
+
+    def load_protected_words(self, path):
+        # 한 줄에 하나씩 적은 보호 단어 목록 파일 (UTF-8, '#' 뒤는 주석)을 추가로 읽는다
+        with open(path, encoding='utf-8') as f:
+            words = [line.split('#', 1)[0].strip() for line in f]
+        self.add_protected_words(word for word in words if word)
+
+    def set_tables(self, batchim_dict=None, unit_batchim_dict=None, particle_pairs=None, protected_words=None):
+        # 규칙 표를 다른 판(load_ruleset)의 것으로 바꾸고 그에 딸린 표와 캐시를 새로 만든다 (None인 표는 그대로)
+        if batchim_dict is not None:
+            self.batchim_dict = frozen_table(batchim_dict)
+            self.char_props = CharProps.shared(self.batchim_dict)
+        if unit_batchim_dict is not None: self.unit_batchim_dict = frozen_table(unit_batchim_dict)
+        if particle_pairs is not None:
+            self.particle_pairs = frozen_table(particle_pairs)
+            self.particle_table = ParticleTable(self.particle_pairs)
+        if protected_words is not None:
+            self.protected_words = frozen_table(protected_words)
+            self.protected_trie = PrefixTrie(self.protected_words)
+        self._target_props = {}
+        self.target_cache = LRUCache(self.FORMULA_CACHE_SIZE)
+
+    def _init_unit_batchim_dict(self):
+        return {
+            'm': False, 'cm': False, 'mm': False, 'km': False,
+            'g': True, 'kg': True, 'mg': True,
+            'l': False, 'L': False, 'mL': False,
+            'A': False, 'V': False, 'W': False, 'kW': False, 'KW': False, 'MW': False, 'GW': False,
+            'Wh': False, 'kWh': False, 'KWh': False, 'MWh': False, 'GWh': False,
+            'Hz': False,
+            'deg': False, 'degree': False,
+            'N': True,
+            'min': True, 
+            'sec': False 
+        }
+
+    def _init_particle_pairs(self):
+        return [
+            ('이다', '이다'), ('입니다', '입니다'),
+            ('이므로', '이므로'), ('이며', '이며'), ('이고', '이고'), ('이나', '이나'),
+            ('이면서', '이면서'), ('이지만', '이지만'), ('이어서', '이어서'),
+            ('이때', '이때'), ('이어야 하므로', '이어야 하므로'),
+            ('가지', '가지'),
+            ('이라서', '라서'), ('이라고', '라고'), ('이라', '라'), ('이면', '면'), 
+            ('은', '는'), ('이', '가'), ('을', '를'), ('과', '와'), ('으로', '로'), ('을', '울')
+        ]
+
+    def get_balanced(self, text, start_idx):
+        if start_idx == -1 or start_idx >= len(text): return None, start_idx
+        count = 0
+        for i in range(start_idx, len(text)):
+            if text[i] == '{': count += 1
+            elif text[i] == '}': count -= 1
+            if count == 0: return text[start_idx+1:i], i + 1
+        return None, start_idx
+
+    def _simplify_canonical(self, current, deadline=None):
+        prev_str = ""
+        while prev_str != current:
+            check_deadline(deadline)
+            prev_str = current
+            if '\\frac' in current:
+                idx = current.find('\\frac')
+                num_start = current.find('{', idx)
+                num, end_num = self.get_balanced(current, num_start)
+                den_start = current.find('{', end_num)
+                _, end_den = self.get_balanced(current, den_start)
+                if num is not None:
+                    # 한국어 분수는 "분모 분의 분자"로 읽으므로 분자를 남김
+                    current = current[:idx] + num + current[end_den:]
+                    continue
+            if '\\sqrt' in current:
+                idx = current.find('\\sqrt')
+                if idx + 5 < len(current) and current[idx+5] == '[':
+                    close_bracket = current.find(']', idx)
+                    if close_bracket != -1:
+                        current = current[:idx+5] + current[close_bracket+1:]
+                        continue
+            stripped = current.strip()
+            if stripped.startswith('{') and stripped.endswith('}'):
+                content, end = self.get_balanced(stripped, 0)
+                if end == len(stripped):
+                    current = content
+                    continue
+        return current
+
+    def canonicalize_formula(self, formula_str):
+        # ★ 핵심 수정: 불필요한 공백 및 띄어쓰기 명령어를 먼저 제거하여 괄호 구조 파악을 용이하게 함
+        formula_str = self.SPACING_RE.sub('', formula_str)
+        formula_str = self.WHITESPACE_RE.sub('', formula_str)
+        return formula_str.replace(r'\left', '').replace(r'\right', '')
+
+    def find_target(self, formula_str, deadline=None):
+        # 정규화한 수식을 캐시 키로 쓰고 대상도 정규화한 수식으로 계산해, 결과가 키에만 달려 있게 한다.
+        # 정규화를 한 번 더 하면 달라지는 수식('\\ ,' -> '\,' 등)은 키로 삼지 않고 원래 수식 그대로 계산.
+        # deadline을 넘기면 BudgetExceeded (캐시에는 아무것도 남기지 않는다)
+        key = self.canonicalize_formula(formula_str)
+        if self.canonicalize_formula(key) != key:
+            return self._find_target_uncached(formula_str, deadline)
+        target = self.target_cache.get(key)
+        if target is None:
+            store = self.persistent_cache
+            if store is not None:
+                fingerprint = self.target_fingerprint()
+                target = store.get_target(fingerprint, key)
+            if target is None:
+                target = self._find_target_uncached(key, deadline)
+                if store is not None: store.put_target(fingerprint, key, target)
+            self.target_cache.put(key, target)
+        return target
+
+    def target_fingerprint(self):
+        # 대상 분석 결과를 좌우하는 규칙 표(받침/단위 사전)의 지문. 읽기 전용 표가 새 표로 바뀌었을 때만 새로 계산
+        tables = (self.batchim_dict, self.unit_batchim_dict)
+        cached_tables, fingerprint = self._fingerprint
+        if cached_tables is None or any(a is not b for a, b in zip(cached_tables, tables)):
+            fingerprint = ruleset_fingerprint(*tables)
+            self._fingerprint = (tables, fingerprint)
+        return fingerprint
+
+    def _find_target_uncached(self, formula_str, deadline=None):
+        # 예산은 단계 사이와 반복 단계마다 확인한다 (정규식 한 번의 실행은 중간에 끊지 못한다)
+        final_term = self._last_term_fast(formula_str, deadline)
+        if final_term is None:
+            check_deadline(deadline)
+            canonical = self.canonicalize_formula(formula_str)
+            try:
+                final_term = self.term_parser.last_term(canonical)
+            except IrregularFormula:
+                final_term = self._last_term_legacy(canonical, deadline)
+        check_deadline(deadline)
+        if deadline is not None and len(final_term) > self.BUDGET_TERM_LENGTH: raise TermTooLong
+        return self._classify_term(final_term)
+
+    def _fallback_target(self, formula_str):
+        # 예산을 넘긴 수식의 간이 판정: 조사는 마지막 항에 달려 있으므로 끝부분만 분석한다 (시간은 수식 길이와 무관).
+        # 끝부분을 그대로 수식으로 보고 분석하므로 결과는 그 끝부분을 키로 캐시해도 된다
+        return self.find_target(self.canonicalize_formula(formula_str)[-self.FALLBACK_TAIL_LENGTH:])
+
+    def _last_term_fast(self, formula_str, deadline=None):
+        # 조사는 마지막으로 읽히는 항에만 달라지므로 수식 끝에서 거꾸로 마지막 관계 기호까지만 본다
+        split = self.term_parser.last_split_offset(formula_str, deadline)
+        if split is None: return None
+        tail = self.canonicalize_formula(formula_str[split:])
+        if '\\frac' not in tail and (split or not tail.startswith('{')): return tail
+        # 분자 안의 관계 기호가 새 분할 위치가 될 수 있으므로 마지막 항만 트리로 다시 나눈다
+        # (수식 전체가 마지막 항이면 바깥 괄호 벗기기까지 트리 경로 그대로)
+        try:
+            return self.term_parser.last_term(tail, unwrap=not split)
+        except IrregularFormula:
+            return None
+
+    def _last_term_legacy(self, canonical, deadline=None):
+        # 괄호 짝이 맞지 않는 등 트리로 재현할 수 없는 수식용 (문자열 치환 방식)
+        clean = self._simplify_canonical(canonical, deadline)
+
+        # 최상위 그룹 사이의 틈만 뒤에서부터 훑어 마지막 분할 기호를 찾고, 그 뒤를 잘라 낸다
+        gaps = []
+        pos = 0
+        for start, end in self.top_level_groups(clean):
+            gaps.append((pos, start))
+            pos = end
+        gaps.append((pos, len(clean)))
+        for start, end in reversed(gaps):
+            last = None
+            for last in self.SPLIT_RE.finditer(clean, start, end): pass
+            if last is not None:
+                return clean[last.end():]
+        return clean
+
+    def top_level_groups(self, text):
+        # 최상위 {...} 그룹의 (시작, 끝) 위치. 닫히지 않는 '{'를 만나면 그 앞까지만
+        groups = []
+        depth = 0
+        for m in self.BRACE_RE.finditer(text):
+            if m.group() == '{':
+                if depth == 0: start = m.start()
+                depth += 1
+            elif depth:
+                depth -= 1
+                if depth == 0: groups.append((start, m.end()))
+        return groups
+
+    def _classify_term(self, final_term):
+        final_term = final_term.rstrip('\\').strip()
+        
+        # 수식 끝의 닫는 괄호 기호(\vert, \rangle 등)를 제거
+        final_term = self.CLOSING_BARS_END_RE.sub('', final_term).strip()
+
+        if r'\end{cases}' in final_term:
+            before_end = final_term.split(r'\end{cases}')[0]
+            final_term = before_end.strip()
+
+        # 프라임 기호 완벽 인식 (닫는 괄호 무시)
+        clean_term_for_prime = self.CLOSERS_SPACE_END_RE.sub('', final_term)
+        if self.PRIME_END_RE.search(clean_term_for_prime) or self.DOUBLE_COMMA_END_RE.search(clean_term_for_prime) or clean_term_for_prime.endswith('prime'):
+            return "프라임"
+
+        if r'\degree' in final_term or r'^\circ' in final_term: return "도"
+        
+        if '/' in final_term:
+            final_term = final_term.split('/')[-1]
+
+        # 수식 끝에 \pi, \alpha 등 그리스 문자가 올 경우 이를 타겟으로 인식
+        clean_final = self.ESCAPED_BRACES_END_RE.sub('', final_term)
+        clean_final = self.CLOSERS_END_RE.sub('', clean_final)
+        greek_match = self.COMMAND_END_RE.search(clean_final)
+        if greek_match:
+            greek_letter = greek_match.group(1)
+            if greek_letter in self.batchim_dict:
+                return greek_letter
+
+        last_caret = final_term.rfind('^')
+        if last_caret != -1:
+            after_caret = final_term[last_caret+1:].strip()
+            after_caret_clean = self.PUNCT_END_RE.sub('', after_caret)
+            # ★ 핵심 수정: 밑첨자/위첨자 뒤의 닫는 중괄호 무시 (일반 중괄호 } 포함)
+            after_caret_clean = self.BRACES_END_RE.sub('', after_caret_clean)
+            
+            is_end_with_exponent = False
+            if after_caret_clean.startswith('{') and after_caret_clean.endswith('}'):
+                content, end_idx = self.get_balanced(after_caret_clean, 0)
+                if end_idx == len(after_caret_clean):
+                    is_end_with_exponent = True
+            elif len(after_caret_clean) == 1:
+                is_end_with_exponent = True
+            elif self.ALNUM_RUN_RE.match(after_caret_clean):
+                is_end_with_exponent = True
+                
+            if is_end_with_exponent:
+                if "C" in after_caret_clean: return "여집합"
+                
+                base_part = final_term[:last_caret]
+                text_match = self.TEXT_CMD_RE.search(base_part)
+                if text_match:
+                    unit_content = text_match.group(1)
+                    if unit_content in ['m', 'cm', 'mm', 'km']: return "미터"
+                    if unit_content in ['s', 'sec']: return "초"
+                return "제곱"
+
+        if "_" in final_term:
+            # ★ 핵심 수정: 수열 기호 등에서 밑첨자 뒤에 닫는 괄호(\} 또는 })가 올 수 있으므로 무시
+            sub_match = self.SUB_GROUP_END_RE.search(final_term)
+            if sub_match:
+                content = sub_match.group(1)
+                content = self.SPACING_RE.sub('', content)
+                content = content.strip()
+                if content:
+                    m = self.LAST_CHAR_END_RE.search(content)
+                    if m: return m.group(1)
+            
+            sub_match_simple = self.SUB_CHAR_END_RE.search(final_term)
+            if sub_match_simple:
+                return sub_match_simple.group(2)
+
+        if final_term.endswith(')'):
+             m = self.PAREN_CHAR_END_RE.search(final_term)
+             if m: return m.group(1)
+
+        text_match = self.TEXT_CMD_RE.search(final_term)
+        if text_match:
+            unit_candidate = text_match.group(1)
+            return f"UNIT:{unit_candidate}"
+            
+        m = self.LETTERS_END_RE.search(final_term)
+        if m:
+            unit_candidate = m.group(1)
+            if unit_candidate in self.unit_batchim_dict:
+                # 단일 문자(m, l, g 등)는 단위가 아닌 변수일 확률이 높으므로 일반 문자로 취급
+                if len(unit_candidate) > 1:
+                    return f"UNIT:{unit_candidate}"
+
+        text_only = self.COMMAND_RE.sub('', final_term)
+        text_only = text_only.replace('_', '').replace('^', '')
+        # 백슬래시(\)도 제거하여 \{3\} 같은 경우 3이 올바르게 남도록 함
+        text_only = self.SYMBOLS_RE.sub('', text_only)
+        text_only = text_only.strip()
+
+        if text_only:
+            return text_only[-1]
+        
+        return ""
+
+    def get_correct_p(self, target, original_p):
+        if self.protected_trie.longest_prefix(original_p): return original_p
+
+        alnum_char, target_class = self.target_props(target)
+        if alnum_char and original_p.startswith('가면'):
+            # x가면 -> x이면 (단, '가면을', '가면이' 처럼 명사 '가면'으로 쓰인 경우는 제외)
+            if not (len(original_p) > 2 and original_p[2] in '을이은과의로'):
+                return '이면' + original_p[2:]
+
+        return self.particle_table.resolve(original_p, target_class)
+
+    def target_props(self, target):
+        # 대상별 (한 글자 영문/숫자 여부, 받침 분류) - 대상마다 한 번만 계산해 둔다
+        props = self._target_props.get(target)
+        if props is None:
+            if len(self._target_props) >= self.TARGET_CACHE_SIZE: self._target_props.clear()
+            has_batchim = self._has_batchim(target)
+            # ㄹ 받침은 한 글자 대상만 (1, 7, 8, L, R, l, r, ㄹ, ㉣, ㄹ 받침 음절)
+            is_rieul = len(target) == 1 and self.char_props.is_rieul(target)
+            if len(target) == 1 and not self.hangul_as_words:
+                bits = self.char_props.bits(target)
+                if bits & CharProps.HANGUL: is_rieul = False
+                elif bits & CharProps.CIRCLED: has_batchim, is_rieul = bool(self.batchim_dict.get(target, False)), False
+            alnum_char = not target.startswith("UNIT:") and len(target) == 1 and bool(self.ALNUM_RE.match(target))
+            props = self._target_props[target] = (alnum_char, ParticleTable.target_class(has_batchim, is_rieul))
+        return props
+
+    def _has_batchim(self, target):
+        if target.startswith("UNIT:"):
+            real_unit = target.split(":")[1]
+            if real_unit in self.unit_batchim_dict:
+                return self.unit_batchim_dict[real_unit]
+            return self.batchim_dict.get(real_unit[-1], False)     # 사전에 없는 끝 글자(한글 음절 포함)는 받침 없음
+        
+        if target == "프라임": return True
+        if target == "미터": return False 
+        if target == "초": return False 
+        
+        return self.char_props.has_batchim(target)
+
+    def clean_latex_for_human(self, latex):
+        text = self.SPACING_RE.sub('', latex)
+        text = self.HUMAN_CMD_RE.sub('', text)
+        text = text.replace('{', '').replace('}', '').replace('\\', '')
+        return text.strip()
+
+    def check_file(self, path, window=256):
+        # 큰 UTF-8 파일을 str로 읽지 않고 mmap 그대로 훑는다 (check_bytes)
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) == 0: return [], Counter()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return self.check_bytes(buf, window)
+
+    def check_bytes(self, buf, window=256):
+        # UTF-8 바이트(bytes/mmap/memoryview)에서 수식 구간을 바이트 정규식으로 차례로 찾고, 수식 본문과
+        # 그 뒤 window 바이트만 풀어 조사를 검사한다. 틈이나 조사가 창 끝에 닿으면 창을 늘려 다시 본다.
+        # 기록의 '위치'는 고칠 한글 조사의 (시작, 끝) 바이트 위치, '문맥'은 수식 앞뒤 몇 글자. (기록 목록, 단계별 횟수)
+        log = []
+        findings = FindingLog()
+        stats = Counter()
+        n = len(buf)
+        spans = MathSpanIndex.iter_spans(buf)
+        ahead = deque()     # 아직 보지 않은 다음 구간들 (창 안에 드는 만큼만 읽어 둔다)
+        exhausted = False
+        pos = 0             # 앞 매치가 끝난 바이트 위치
+        while True:
+            if not ahead:
+                span = next(spans, None)
+                if span is None: break
+                ahead.append(span)
+            span = ahead.popleft()
+            if span.start < pos: continue
+            size = window
+            while True:
+                limit = min(n, span.end + size)
+                while not exhausted and (not ahead or ahead[-1].start < limit):
+                    nxt = next(spans, None)
+                    if nxt is None: exhausted = True
+                    else: ahead.append(nxt)
+                # 창에 걸친 구간은 통째로 넣고, UTF-8 글자 중간에서 자르지 않는다
+                for other in ahead:
+                    if other.start >= limit: break
+                    limit = max(limit, other.end)
+                while limit < n and buf[limit] & 0xC0 == 0x80: limit += 1
+                tail = self._decode(buf[span.end:limit])
+                tail_spans = MathSpanIndex(self._local_span(buf, span.end, other) for other in ahead if other.start < limit)
+                found, truncated = self._tail_particle(tail, tail_spans)
+                if not truncated or limit >= n: break
+                size *= 4
+            if found is None:
+                pos = span.end
+                continue
+            p_start, p_end = found
+            ctx_start = max(pos, span.start - 40)
+            while ctx_start < span.start and buf[ctx_start] & 0xC0 == 0x80: ctx_start += 1
+            before = self._decode(buf[ctx_start:span.start])
+            open_delim = self._decode(buf[span.start:span.body_start])
+            formula = self._decode(buf[span.body_start:span.body_end])
+            close_delim = self._decode(buf[span.body_end:span.end])
+            gap, particle = tail[:p_start], tail[p_start:p_end]
+            context_text = before + open_delim + formula + close_delim + tail[:p_end + 10]
+            match_end = len(before) + len(open_delim) + len(formula) + len(close_delim) + p_end
+            self._fix_formula_particle(findings, stats, context_text, len(before), match_end,
+                                       '', open_delim, formula, close_delim, gap, particle)
+            particle_at = span.end + len(self._encode(gap))
+            pos = particle_at + len(self._encode(particle))
+            if len(findings) > len(log):
+                # 위치는 고친 한글 조사만 (마침표만 지운 경우는 조사 자리 전체)
+                p_match = self.HANGUL_RUN_RE.search(particle)
+                fix_start, fix_end = p_match.span() if p_match else (0, len(particle))
+                row = findings[-1]
+                row["위치"] = (particle_at + len(self._encode(particle[:fix_start])),
+                              particle_at + len(self._encode(particle[:fix_end])))
+                log.append(row)
+        return log, stats
+
+    def _tail_particle(self, tail, spans):
+        # tail(수식 바로 뒤부터)에서 scan_formula_particles와 같은 규칙으로 조사 (시작, 끝)을 찾는다.
+        # 틈 사슬이나 조사가 tail 끝에 닿았으면 truncated (창이 짧아 결과가 달라질 수 있음)
+        best = None
+        g = 0
+        while g < len(tail):
+            if self._is_particle_char(tail[g]): best = g
+            nxt = self._gap_step(tail, g, spans)
+            if nxt < 0: break
+            g = nxt
+        truncated = g >= len(tail) - 1   # 끝 글자에서 멈췄으면 ('\' 등) 뒤를 더 봐야 할 수 있다
+        if best is None: return None, truncated
+        p_end = self.PARTICLE_RUN_RE.match(tail, best).end()
+        return (best, p_end), truncated or p_end >= len(tail)
+
+    def _local_span(self, buf, base, span):
+        # 바이트 위치의 구간을 buf[base:]를 푼 문자열 안의 글자 위치로
+        offsets = [len(self._decode(buf[base:b])) for b in (span.start, span.end, span.body_start, span.body_end)]
+        return MathSpan(offsets[0], offsets[1], span.kind, offsets[2], offsets[3])
+
+    def _decode(self, data):
+        # 잘못된 바이트도 한 글자씩 보존해 다시 인코딩하면 같은 바이트가 되도록 한다
+        return bytes(data).decode('utf-8', 'surrogateescape')
+
+    def _encode(self, text):
+        return text.encode('utf-8', 'surrogateescape')
+
+    def parse_input(self, raw_input):
+        # JSON({"result": ...}) 또는 dict로 들어오면 result만, 아니면 입력 전체를 교정 대상으로 본다
+        try:
+            if isinstance(raw_input, dict): input_data = raw_input
+            else: input_data = json.loads(raw_input)
+            return input_data.get("result", raw_input) if isinstance(input_data, dict) else str(raw_input)
+        except (ValueError, TypeError):
+            # JSON이 아닌 글(ValueError)이나 문자열이 아닌 입력(TypeError)만. 예산 초과/중단은 그대로 올려 보낸다
+            return str(raw_input)
+
+    def run(self, raw_input):
+        # 결과를 self.log/self.math_spans에도 남기는 예전 방식. 한 인스턴스를 여러 스레드가 함께 쓸 때는 CorrectionPipeline.run.
+        # 돌려주는 기록은 dict의 list가 아니라 FindingLog다 (읽기는 list와 같고, 고치거나 견줄 때는 list(log))
+        log = FindingLog()
+        fallback_log = FindingLog()
+        stats = Counter()
+        target_text = self.parse_input(raw_input)
+
+        spans = MathSpanIndex.from_text(target_text)
+        edits = list(self.particle_edits(target_text, spans, log, stats, fallback_log=fallback_log))
+        # SpellingCorrector가 수식을 다시 찾지 않도록 교정된 텍스트 기준 색인을 남긴다
+        self.log = log
+        self.fallback_log = fallback_log
+        self.prefilter_stats = stats
+        self.math_spans = spans.shifted([(e.start, len(e.replacement) - (e.end - e.start)) for e in edits])
+        return apply_edits(target_text, edits), log
+
+    def particle_edits(self, text, spans, log, stats=None, matches=None, fallback_log=None):
+        # 바뀌는 조사마다 Edit(시작, 끝, 고친 글자, 규칙)을 글 순서대로 (기록은 log에 남긴다).
+        # 편집은 조사 중 실제로 바뀌는 부분만 덮고, 조사는 한글/공백/.?!만으로 이루어지므로 늘 수식 밖 본문 조각 하나 안에 있다.
+        # stats(Counter)를 주면 수식 뒤 조사마다 어느 단계에서 판정이 끝났는지 센다.
+        # matches: 이미 구한 scan_formula_particles 결과 (규칙 표와 무관하므로 여러 판이 함께 쓴다)
+        # fallback_log를 주면 시간 예산/긴 마지막 항 때문에 끝부분만 보고 판정한 조사를 모두 남긴다 (오류 기록이 아님)
+        if stats is None: stats = Counter()
+        if matches is None: matches = self.scan_formula_particles(text, spans)
+        document_deadline = self.document_deadline()
+        for match in matches:
+            edit = self.particle_edit(log, stats, text, match, document_deadline, fallback_log)
+            if edit is not None: yield edit
+
+    def document_deadline(self):
+        # 글 하나의 시간 예산이 끝나는 시각 (예산이 없으면 None)
+        return None if self.document_budget is None else time.perf_counter() + self.document_budget
+
+    def particle_edit(self, log, stats, text, match, document_deadline=None, fallback_log=None):
+        # scan_formula_particles 매치 하나를 검사해 바뀌는 부분의 Edit을, 그대로면 None을 돌려준다
+        particle = match[-1]
+        replaced = self._fix_formula_particle(log, stats, text, *match, document_deadline=document_deadline,
+                                              fallback_log=fallback_log)
+        new_particle = replaced[match[1] - match[0] - len(particle):]   # 앞부분(앞 텍스트~틈)은 그대로다
+        if new_particle == particle: return None
+        rule = 'formula_period' if new_particle == particle.replace('.', '') else 'formula_josa'
+        # 앞뒤로 같은 글자는 편집에서 뺀다
+        head = 0
+        while head < len(new_particle) and particle[head] == new_particle[head]: head += 1
+        tail = 0
+        while (tail < len(new_particle) - head and tail < len(particle) - head
+               and particle[-1 - tail] == new_particle[-1 - tail]): tail += 1
+        p_start = match[1] - len(particle)
+        return Edit(p_start + head, match[1] - tail, new_particle[head:len(new_particle) - tail], rule)
+
+    def _fix_formula_particle(self, log, stats, target_text, match_start, match_end, prefix, open_delim, formula, close_delim, gap, particle,
+                              document_deadline=None, fallback_log=None):
+        # 수식 뒤 조사 하나를 검사해 바꾼 문자열을 돌려준다 (target_text는 문맥 표시용).
+        # 싼 검사부터 차례로 하고, 마지막 항 분석(find_target)은 그 결과로 조사가 바뀔 수 있을 때만 한다
+        original = f"{prefix}{open_delim}{formula}{close_delim}{gap}{particle}"
+
+        if '\n' in gap or '\r' in gap:
+            stats['틈에 줄바꿈'] += 1
+            return original
+
+        if ',' in gap:
+            stats['틈에 쉼표'] += 1
+            return original
+
+        formula_clean = formula.replace('\\\\', '\\')
+        fc_stripped = formula_clean.strip()
+        if not fc_stripped or fc_stripped in ['\\', '\\\\', '\\quad', '\\qquad', '\\,']:
+            stats['빈 수식'] += 1
+            return original
+            
+        # \, \; \: \. 등 백슬래시가 포함된 LaTeX 명령어는 무시하지 않도록 부정 후방 탐색(?<!\\) 적용
+        if self.FORMULA_PUNCT_END_RE.search(fc_stripped):
+            stats['수식 끝 문장부호'] += 1
+            return original
+
+        p_match = self.HANGUL_RUN_RE.search(particle)
+
+        if not p_match:
+            if '.' in particle:
+                stats['마침표 제거'] += 1
+                new_particle = particle.replace('.', '')
+                human_readable = self.clean_latex_for_human(formula_clean)
+                log.add(target_text, match_start, match_end, human_readable, particle, new_particle, "불필요한 마침표 제거")
+                return f"{prefix}{open_delim}{formula}{close_delim}{gap}{new_particle}"
+            stats['한글 없음'] += 1
+            return original
+
+        p_start = p_match.start()
+        original_p = p_match.group()
+        if self.protected_trie.longest_prefix(particle, p_start):
+            stats['보호 단어'] += 1
+            return original
+
+        if not self.particle_table.can_change(original_p):
+            stats['바뀔 수 없는 조사'] += 1
+            return original
+        
+        stats['대상 분석'] += 1
+        deadline = document_deadline
+        if self.formula_budget is not None:
+            formula_deadline = time.perf_counter() + self.formula_budget
+            if deadline is None or formula_deadline < deadline: deadline = formula_deadline
+        try:
+            target = self.find_target(formula_clean, deadline)
+        except BudgetExceeded as exc:
+            # 분석을 그만두고 끝부분만으로 판정. 시간이 실제로 지난 것과 마지막 항이 길어 건너뛴 것은 따로 세고 따로 기록한다.
+            # 간이 판정은 모두 fallback_log에 남기고, 오류 기록(log)에는 조사가 바뀐 것만 남긴다
+            stats['간이 판정'] += 1
+            if isinstance(exc, TermTooLong):
+                stats['긴 마지막 항'] += 1
+                reason = "마지막 항이 너무 김 (수식 끝부분만 분석)"
+            else:
+                stats['예산 초과'] += 1
+                if document_deadline is not None and time.perf_counter() > document_deadline: stats['글 예산 초과'] += 1
+                reason = "시간 예산 초과 (수식 끝부분만 분석)"
+            target = self._fallback_target(formula_clean)
+            correct_p = self.get_correct_p(target, original_p)
+            human_readable = self.clean_latex_for_human(formula_clean[-200:])    # 긴 수식은 끝부분만 보인다
+            if fallback_log is not None:
+                fallback_log.add(target_text, match_start, match_end, human_readable, original_p, correct_p, reason)
+            if original_p == correct_p:
+                stats['간이 판정 그대로'] += 1
+                return original
+            log.add(target_text, match_start, match_end, human_readable, original_p, correct_p, reason)
+            return f"{prefix}{open_delim}{formula}{close_delim}{gap}{particle[:p_start]}{correct_p}{particle[p_match.end():]}"
+        correct_p = self.get_correct_p(target, original_p)
+        
+        if original_p != correct_p:
+            stats['교정'] += 1
+            human_readable = self.clean_latex_for_human(formula_clean)
+            log.add(target_text, match_start, match_end, human_readable, original_p, correct_p, "받침 호응 오류")
+            return f"{prefix}{open_delim}{formula}{close_delim}{gap}{particle[:p_start]}{correct_p}{particle[p_match.end():]}"
+
+        return original
+
+    def scan_formula_particles(self, text, spans=None):
+        # 색인의 수식 구간마다 그 뒤의 틈(공백, 쉼표, \명령, $\,$ 등)과 한글 조사를 찾아
+        # (시작, 끝, 앞 텍스트, 여는 구분자, 수식, 닫는 구분자, 틈, 조사)를 차례로 돌려준다
+        return (match for _, match in self.scan_span_particles(text, spans) if match is not None)
+
+    def scan_span_particles(self, text, spans=None):
+        # 색인의 구간마다 (구간, 그 뒤 조사 매치 또는 None)을 차례로 돌려준다. 매치는 구간 바로 뒤 틈만 읽고 구하므로
+        # 앞에서부터 멈출 수 있는 검사(CorrectionPipeline.check)가 구간 하나씩 끊어 쓸 수 있다.
+        # 틈 안에 든 $\,$ 같은 구간이나 이미 읽은 조사 안의 구간은 건너뛴다 (매치 None)
+        if spans is None: spans = MathSpanIndex.from_text(text)
+        pos = 0         # 앞 매치(또는 조사가 없던 수식)가 끝난 위치
+        chains = {}     # 틈 위치 -> 그 뒤 사슬에서 조사가 시작될 수 있는 마지막 위치
+        for span in spans:
+            if span.start < pos:
+                yield span, None
+                continue
+            p_start = self._particle_start(text, span.end, chains, spans)
+            if p_start is None:
+                pos = span.end
+                yield span, None
+                continue
+            p_end = self.PARTICLE_RUN_RE.match(text, p_start).end()
+            yield span, (pos, p_end, text[pos:span.start], text[span.start:span.body_start],
+                         text[span.body_start:span.body_end], text[span.body_end:span.end],
+                         text[span.end:p_start], text[p_start:p_end])
+            pos = p_end
+            chains.clear()
+
+    def _particle_start(self, text, g, chains, spans):
+        # 틈 항목 사슬은 위치마다 하나로 정해지므로, 조사가 시작될 수 있는 자리는 사슬 위의 위치들뿐이다.
+        # 그중 마지막 자리를 돌려주고 (예전 정규식이 되돌아가며 고르던 자리) 지나간 위치는 chains에 기록
+        path = []
+        best = None
+        while g < len(text):
+            if g in chains:
+                best = chains[g]
+                break
+            path.append(g)
+            g = self._gap_step(text, g, spans)
+            if g < 0: break
+        for p in reversed(path):
+            if best is None and self._is_particle_char(text[p]): best = p
+            chains[p] = best
+        return best
+
+    def _gap_step(self, text, g, spans):
+        # 틈 항목 하나 ([\s,] | \명령 | \문자 | 본문이 간격 명령/공백뿐인 수식 구간)를 읽고 다음 위치를, 없으면 -1
+        c = text[g]
+        if c == ',' or c.isspace(): return g + 1
+        if c != '$' and c != '\\': return -1
+        span = spans.span_at(g)
+        if span is not None and span.start == g:
+            return span.end if self.GAP_BODY_RE.fullmatch(text, span.body_start, span.body_end) else -1
+        return self._skip_escape(text, g) if c == '\\' else -1
+
+    def _skip_escape(self, text, g):
+        # '\' 뒤의 영문자 명령어 전체, 아니면 문자 하나
+        j = g + 1
+        if j >= len(text): return -1
+        while j < len(text) and text[j] in self.term_parser.LETTERS: j += 1
+        return j if j > g + 1 else g + 2
+
+    def _is_particle_char(self, c):
+        return '가' <= c <= '힣' or c.isspace() or c in '.?!'
+
+# ==========================================
+# 4. 한글 맞춤법/오타/조사 교정 클래스
+# ==========================================
+# 선언형 치환 규칙 하나: pattern(찾을 글자 그대로)을 replace로 고친다. before는 pattern 바로 앞에서 끝나는 글,
+# after는 바로 뒤에서 시작하는 글에 대한 정규식 조건이고 없으면 None. 글자를 먹는 패턴(before='몇 ', after='[가-힣]')도
+# 되고 둘러보기(before='(?<![가-힣])', after='(?![가-힣])')도 된다. before는 길이가 정해진 패턴만. reason은 기록의 '사유'
+TextRule = namedtuple('TextRule', ['pattern', 'replace', 'reason', 'before', 'after'],
+                      defaults=("맞춤법/표준어 오류", None, None))
+
+
+def load_numpy():
+    # numpy는 말뭉치용 조사 검사(SpellingCorrector.find_josa_errors)에서만 쓰므로 처음 쓸 때 읽는다.
+    # 모듈을 읽는 비용과 (GIL 없는 빌드에서) GIL을 다시 켜는 확장 모듈을 그 검사를 쓰는 쪽만 치른다. 없으면 None
+    if not _numpy:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy.append(numpy)
+    return _numpy[0]
+
+
+_numpy = []     # load_numpy가 읽은 결과 (numpy 모듈 또는 None) 하나
+
+
+class TypoAutomaton:
+    # 오탈자 사전과 선언형 규칙(TextRule) 전체를 글 한 번 훑어서 찾는 Aho-Corasick 오토마톤
+    # (가장 왼쪽, 같은 위치면 조건을 만족하는 가장 긴 규칙 우선). 앞/뒤 조건은 후보가 나온 자리에서만 확인하므로
+    # 규칙이 늘어도 글 한 번 훑는 비용은 거의 그대로다.
+    # 만든 뒤에는 바꾸지 않으므로 여러 스레드가 함께 써도 된다 (사전을 늘릴 때는 새로 만든다)
+    def __init__(self, typo_dict=None, rules=()):
+        self.words = {wrong: correct for wrong, correct in (typo_dict or {}).items() if wrong}
+        # 패턴 -> [(앞 조건, 뒤 조건, 규칙)], 조건 있는 규칙을 먼저 (같은 패턴의 조건 없는 규칙은 나중 것 하나만).
+        # 조건 정규식은 같은 조건끼리 하나를 함께 쓴다 (후보 시작/끝 위치에서 match)
+        self.rules = {wrong: [(None, None, TextRule(wrong, correct))] for wrong, correct in self.words.items()}
+        conditions = {}
+        for rule in rules:
+            if not rule.pattern: continue
+            entries = self.rules.setdefault(rule.pattern, [])
+            if rule.before is None and rule.after is None:
+                entries[:] = [entry for entry in entries if entry[:2] != (None, None)] + [(None, None, rule)]
+                continue
+            entry = self.compile_conditions(rule, conditions) + (rule,)
+            entries.insert(sum(1 for before, after, _ in entries if before or after), entry)
+        goto, fail, length = [{}], [0], [0]
+        for word in self.rules:
+            state = 0
+            for ch in word:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({}); fail.append(0); length.append(0)
+                state = nxt
+            length[state] = len(word)
+        # 실패 링크와, 실패 링크를 따라가며 만나는 가장 가까운 단어 끝 상태(link)를 너비 우선으로 채운다
+        link = [0] * len(goto)
+        queue = list(goto[0].values())
+        for state in queue:
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]: f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[nxt] = f
+                link[nxt] = f if length[f] else link[f]
+                queue.append(nxt)
+        self.goto, self.fail, self.length, self.link = goto, fail, length, link
+        # 루트에서 시작할 수 있는 글자로 바로 건너뛰기 위한 문자 집합
+        self.start_re = re.compile('[' + ''.join(re.escape(ch) for ch in sorted(goto[0])) + ']') if goto[0] else None
+
+    @classmethod
+    def compile_conditions(cls, rule, cache=None):
+        # 규칙의 (앞 조건, 뒤 조건)을 후보 시작/끝 위치에서 match할 정규식으로 (없으면 None). match는 그 위치부터
+        # 글을 읽으므로 앞 조건은 (?<=...)로 감싸 후보 바로 앞 글을 보게 하고 (길이가 정해지지 않은 패턴이면 re.error),
+        # 뒤 조건은 (?=...)로 감싼다. cache(dict)를 주면 같은 조건끼리 정규식 하나를 함께 쓴다
+        if cache is None: cache = {}
+        compiled = []
+        for template, cond in (('(?<=%s)', rule.before), ('(?=%s)', rule.after)):
+            if cond is None:
+                compiled.append(None)
+                continue
+            key = (template, cond)
+            if key not in cache: cache[key] = re.compile(template % cond)
+            compiled.append(cache[key])
+        return tuple(compiled)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def find(self, text):
+        # 겹치지 않는 (start, end) 목록. 같은 시작 위치에서는 조건을 만족하는 가장 긴 단어, 그다음 그 끝부터 다시 찾는다
+        return [(start, end) for start, end, _ in self.match(text)]
+
+    def match(self, text):
+        # find와 같되 (start, end, 적용할 TextRule) 목록
+        if self.start_re is None: return []
+        goto, fail, length, link = self.goto, self.fail, self.length, self.link
+        search = self.start_re.search
+        lengths = {}    # 시작 위치 -> 그 위치에서 시작하는 후보 길이들
+        state = 0
+        i, n = 0, len(text)
+        while i < n:
+            if state == 0:
+                m = search(text, i)
+                if m is None: break
+                i = m.start()
+            ch = text[i]
+            while state and ch not in goto[state]: state = fail[state]
+            state = goto[state].get(ch, 0)
+            hit = state if length[state] else link[state]
+            while hit:
+                start = i + 1 - length[hit]
+                if start in lengths: lengths[start].append(length[hit])
+                else: lengths[start] = [length[hit]]
+                hit = link[hit]
+            i += 1
+        found = []
+        pos = 0
+        for start in sorted(lengths):
+            if start < pos: continue
+            for size in sorted(lengths[start], reverse=True):
+                rule = self._accept(text, start, start + size)
+                if rule is not None:
+                    pos = start + size
+                    found.append((start, pos, rule))
+                    break
+        return found
+
+    def _accept(self, text, start, end):
+        for before, after, rule in self.rules[text[start:end]]:
+            if (before is None or before.match(text, start)) and (after is None or after.match(text, end)): return rule
+        return None
+
+
+class SpellingCorrector:
+    JOSA_RE = re.compile(r'([가-힣㉠-㉭])(은|는|이|가|을|를|과|와|으로|로)(?![가-힣])')
+
+    def __init__(self):
+        self.log = FindingLog()
+        self.typo_dict = {
+            "자리수": "자릿수", "최대값": "최댓값", "최소값": "최솟값", "극대값": "극댓값", "극소값": "극솟값",
+            "절대값": "절댓값", "근사값": "근삿값", "대표값": "대푯값", "함수값": "함숫값",
+            "꼭지점": "꼭짓점", "촛점": "초점", "갯수": "개수", "나누기": "나눗셈",
+            "않되": "안 되", "않돼": "안 돼", "않된다": "안 된다", "문안": "무난",
+            "금새": "금세", "역활": "역할", "제작년": "재작년", "어떻해": "어떡해",
+            "몇일": "며칠", "들어나다": "드러나다", "가르키다": "가리키다", "맞추다": "맞히다"
+        }
+        self.text_rules = ()    # 선언형 규칙 (add_rules/load_rules). 오탈자 사전과 함께 한 오토마톤으로 찾는다
+        self.typo_automaton = TypoAutomaton(self.typo_dict, self.text_rules)
+        self.char_props = CharProps.shared(DEFAULT_BATCHIM_DICT)
+        self.char_table = self.char_props.table
+        self.korean_particle_pairs = [
+            ('은', '는'), ('이', '가'), ('을', '를'), ('과', '와'), ('으로', '로')
+        ]
+        
+        self.exceptions = {
+            '증가', '추가', '결과', '효과', '초과', '교과', '부과', '사과', '투과',
+            '평가', '원가', '정가', '단가', '시가',
+            '사이', '차이', '나이', '아이', '오이', '놀이',
+            '경로', '진로', '선로', '항로',
+            '없는', '있는', '갖는', '맞는', '맡는', '웃는', '씻는', '깎는', '볶는', '않는',
+            '이은', '이을', '이어', '이어서', '깊은', '높은', '작은', '좁은',
+            '인가', '는가', '은가', '던가', '나', '가' 
+        }
+        # 규칙 표는 읽기 전용 (frozen_table). 바꿀 때는 add_typos/add_rules/set_tables로 새 표를 바꿔 끼운다
+        self.typo_dict = frozen_table(self.typo_dict)
+        self.korean_particle_pairs = frozen_table(self.korean_particle_pairs)
+        self.exceptions = frozen_table(self.exceptions)
+
+    def correct_segment(self, segment, log):
+        # 수식 밖 본문 조각 하나: 오탈자 치환 뒤 조사 호응 (기록은 log에 남긴다)
+        return apply_edits(segment, self.segment_edits(segment, log))
+
+    def segment_edits(self, segment, log):
+        # correct_segment의 편집 목록 (segment 기준). 조사 호응은 오탈자를 고친 글에서 찾으므로 위치를 옮겨 합친다
+        typo_edits = self.typo_edits(segment, log)
+        replaced = apply_edits(segment, typo_edits) if typo_edits else segment
+        josa_edits = []
+        for match in self.JOSA_RE.finditer(replaced):
+            fixed = self._fix_josa(match, log)
+            if fixed != match.group(0):
+                josa_edits.append(Edit(match.start(2), match.end(), fixed[1:], 'word_josa'))
+        return compose_edits(segment, typo_edits, josa_edits) if typo_edits else josa_edits
+
+    def add_typos(self, typo_dict):
+        # 늘린 사전으로 오토마톤을 새로 만들어 한 번에 바꿔 끼운다 (같은 틀린 말이 있으면 새 값으로 바뀜)
+        typos = frozen_table({**self.typo_dict, **typo_dict})
+        self.typo_automaton = TypoAutomaton(typos, self.text_rules)
+        self.typo_dict = typos
+
+    def add_rules(self, rules):
+        # TextRule 또는 {'pattern', 'replace', 'reason', 'before', 'after'} dict 목록을 더한다 (같은 패턴이면 조건 있는 규칙 먼저)
+        # 잘못된 조건(re.error)은 오토마톤을 만들다가 알리므로 바꿔 끼우기 전에 멈춘다
+        rules = self.text_rules + tuple(rule if isinstance(rule, TextRule) else TextRule(**rule) for rule in rules)
+        self.typo_automaton = TypoAutomaton(self.typo_dict, rules)
+        self.text_rules = rules
+
+    def load_rules(self, path):
+        # JSON 규칙 파일: [{"pattern": "않되", "replace": "안 되", "after": "(?![가-힣])"}, ...] (reason/before/after는 생략 가능)
+        with open(path, encoding='utf-8') as f:
+            self.add_rules(json.load(f))
+
+    def set_tables(self, typo_dict=None, exceptions=None, korean_particle_pairs=None):
+        # 규칙 표를 다른 판(load_ruleset)의 것으로 바꾼다 (None인 표는 그대로)
+        if typo_dict is not None:
+            self.typo_automaton = TypoAutomaton(typo_dict, self.text_rules)
+            self.typo_dict = frozen_table(typo_dict)
+        if exceptions is not None: self.exceptions = frozen_table(exceptions)
+        if korean_particle_pairs is not None: self.korean_particle_pairs = frozen_table(korean_particle_pairs)
+
+    def load_typo_dict(self, path):
+        # 한 줄에 '틀린말<탭>고친말' (UTF-8, '#' 뒤는 주석) 형식의 표준어 목록을 추가로 읽는다
+        typos = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                line = line.split('#', 1)[0].rstrip('\r\n')
+                if '\t' in line:
+                    wrong, correct = line.split('\t', 1)
+                    if wrong.strip(): typos[wrong.strip()] = correct.strip()
+        self.add_typos(typos)
+
+    def typo_edits(self, text, log):
+        edits = []
+        for start, end, rule in self.typo_automaton.match(text):
+            wrong = text[start:end]
+            log.add_excerpt(text, start, end, wrong, wrong, rule.replace, rule.reason)
+            edits.append(Edit(start, end, rule.replace, 'typo'))
+        return edits
+
+    def run(self, text, spans=None):
+        # spans: text의 MathSpanIndex (JosaCorrector.math_spans). 없으면 새로 만든다.
+        # 기록은 JosaCorrector.run처럼 FindingLog (dict의 list가 아니다)
+        log = FindingLog()
+        if spans is None: spans = MathSpanIndex.from_text(text)
+        parts = spans.split(text)
+        final_parts = []
+        
+        for i, part in enumerate(parts):
+            if i % 2 == 1:
+                final_parts.append(part)
+                continue
+            
+            final_parts.append(self.correct_segment(part, log))
+            
+        self.log = log
+        return "".join(final_parts), log
+
+    def _fix_josa(self, match, log):
+        # 한글 낱말 뒤 조사 하나 (문맥은 치환 중인 글 match.string 기준)
+        full_word = match.group(0)
+        noun_char = match.group(1)
+        josa = match.group(2)
+        
+        if full_word in self.exceptions:
+            return full_word
+        
+        if noun_char in ['이', '그', '저']:
+            return full_word
+
+        correct_josa = self._correct_josa(noun_char, josa)
+        
+        if josa != correct_josa:
+            log.add_excerpt(match.string, match.start(), match.end(), full_word, josa, correct_josa, "조사 호응 오류")
+            return f"{noun_char}{correct_josa}"
+        return match.group(0)
+
+    def _correct_josa(self, noun_char, josa):
+        # 가-힣은 실제 받침, ㉠-㉭은 자음 이름(기역, 니은, ...)이라 늘 받침이 있고 ㉣만 ㄹ 받침
+        bits = self.char_props.char_bits(noun_char)
+        has_bat = bool(bits & CharProps.HAS_BATCHIM)
+        is_rieul = bool(bits & CharProps.RIEUL)
+
+        for bat_o, bat_x in self.korean_particle_pairs:
+            if josa == bat_o or bat_x == josa:
+                if bat_o == '으로':
+                    if not has_bat or is_rieul: return '로'
+                    return '으로'
+                return bat_o if has_bat else bat_x
+        return josa
+
+    def find_josa_errors(self, text, spans=None, chunk_size=1 << 20, log=None):
+        # 말뭉치 검사용: 수식 밖 한글 낱말 뒤 조사 호응 오류만 찾아 기록 목록으로 돌려준다 (글은 고치지 않고 오탈자 치환도 하지 않음).
+        # numpy가 있으면 글 전체를 코드 포인트 배열로 바꿔 받침이 틀린 후보만 한꺼번에 골라내고,
+        # 예외 단어와 '이/그/저' 확인, 기록 작성만 파이썬에서 한다. 없으면 JOSA_RE로 같은 후보를 찾는다.
+        # log에 FindingSummary를 주면 같은 오류를 묶어서 센다
+        if spans is None: spans = MathSpanIndex.from_text(text)
+        np = load_numpy()
+        hits = self._josa_candidates_numpy(np, text, chunk_size) if np is not None else self._josa_candidates_regex(text)
+        if log is None: log = FindingLog()
+        for start, end in hits:
+            if spans.is_math(start): continue
+            full_word = text[start:end]
+            noun_char, josa = full_word[0], full_word[1:]
+            if full_word in self.exceptions or noun_char in ['이', '그', '저']: continue
+            correct_josa = self._correct_josa(noun_char, josa)
+            if josa != correct_josa:
+                log.add(text, start, end, full_word, josa, correct_josa, "조사 호응 오류")
+        return log
+
+    def _josa_candidates_regex(self, text):
+        for m in self.JOSA_RE.finditer(text):
+            yield m.start(), m.end()
+
+    def _josa_candidates_numpy(self, np, text, chunk_size):
+        # JOSA_RE와 같은 후보 가운데 받침과 조사가 맞지 않는 것만 (시작, 끝)으로. 배열은 chunk_size 글자씩 만든다
+        pairs = [(ord(bat_o), ord(bat_x)) for bat_o, bat_x in self.korean_particle_pairs if len(bat_o) == len(bat_x) == 1]
+        eu, ro = ord('으'), ord('로')
+        table = np.frombuffer(self.char_table, dtype=np.uint8)
+        for a in range(0, len(text), chunk_size):
+            b = min(a + chunk_size, len(text))
+            # 왼쪽 한 글자('X으로'와 겹치는 '으로' 후보 확인용)와 오른쪽 세 글자(조사와 그 뒤 글자)를 더 읽는다.
+            # 글 끝 너머는 0 (한글이 아닌 글자)으로 채운다
+            left = 1 if a else 0
+            piece = text[a - left:b + 3]
+            codes = np.zeros(len(piece) + 3, dtype=np.uint32)
+            codes[:len(piece)] = np.frombuffer(piece.encode('utf-32-le'), dtype=np.uint32)
+            bits = np.where(codes < len(table), table[np.minimum(codes, len(table) - 1)], 0)
+            hangul = (bits & CharProps.HANGUL) != 0
+            noun = hangul | ((bits & CharProps.CIRCLED) != 0)
+            has = (bits & CharProps.HAS_BATCHIM) != 0
+            rieul = (bits & CharProps.RIEUL) != 0
+            m = len(codes) - 3
+            c0, c1, c2 = codes[:m], codes[1:m + 1], codes[2:m + 2]
+            free1, free2 = ~hangul[2:m + 2], ~hangul[3:m + 3]      # 조사 뒤가 한글이 아님
+            # 한 글자 조사: X + 조사 + (한글 아님)
+            one = np.zeros(m, dtype=bool)
+            wrong = np.zeros(m, dtype=bool)
+            for bat_o, bat_x in pairs:
+                is_o, is_x = c1 == bat_o, c1 == bat_x
+                one |= is_o | is_x
+                wrong |= (is_o & ~has[:m]) | (is_x & has[:m] & (bat_o != bat_x))
+            is_ro = c1 == ro
+            one |= is_ro
+            wrong |= is_ro & has[:m] & ~rieul[:m]
+            one &= noun[:m] & free1
+            # 두 글자 조사 '으로': X + 으 + 로 + (한글 아님)
+            two = noun[:m] & (c1 == eu) & (c2 == ro) & free2
+            wrong2 = two & (~has[:m] | rieul[:m])
+            # 'X으로'가 먼저 맞으면 바로 뒤 '으로'의 '으'에서 시작하는 후보는 겹쳐서 없어진다
+            one[1:] &= ~two[:-1]
+            keep_from, keep_to = left, left + (b - a)
+            for i in np.flatnonzero((one & wrong) | wrong2):
+                if keep_from <= i < keep_to:
+                    start = a - left + int(i)
+                    yield start, start + (3 if two[i] else 2)
+
+# ==========================================
+# 5. 통합 교정 파이프라인
+# ==========================================
+# 교정 코드가 바뀌어 같은 규칙 표에서도 결과가 달라지면 올린다 (영구 캐시 무효화)
+RULESET_VERSION = 1
+
+
+def gil_enabled():
+    # GIL이 켜져 있는지 (자유 스레드 빌드에서도 GIL을 쓰는 확장 모듈을 읽으면 다시 켜지므로 쓸 때마다 묻는다).
+    # sys._is_gil_enabled가 없는 3.12 이하는 늘 GIL이 있다
+    is_enabled = getattr(sys, '_is_gil_enabled', None)
+    return True if is_enabled is None else is_enabled()
+
+
+def ruleset_fingerprint(*tables):
+    # 규칙 표(dict/list/set과 그 읽기 전용판)를 순서가 정해진 JSON으로 바꿔 해시한다
+    payload = json.dumps([RULESET_VERSION] + list(tables), ensure_ascii=False, sort_keys=True, default=_table_json)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _table_json(table):
+    return dict(table) if isinstance(table, MappingProxyType) else sorted(table)
+
+
+# 판마다 읽어 올 규칙 표 (클래스 -> 표 이름)
+RULESET_TABLES = {
+    'JosaCorrector': ('batchim_dict', 'unit_batchim_dict', 'particle_pairs', 'protected_words'),
+    'SpellingCorrector': ('typo_dict', 'exceptions', 'korean_particle_pairs'),
+}
+
+
+def load_ruleset(path):
+    # 이 저장소의 다른 판 스크립트(adplusreporter1.py, addplusreporter9.py ...)에서 규칙 표만 읽는다. 모듈을 import하면
+    # Streamlit 화면 코드까지 돌기 때문에 구문 트리만 보고, 코드는 하나도 실행하지 않는다:
+    # __init__의 self.<표> = 리터럴은 literal_eval로, _init_<표>() 메서드는 정해진 모양(_literal_table)만 읽는다.
+    # self.<표> = <모듈 상수>이면 모듈 맨 위의 <모듈 상수> = 리터럴 (또는 MappingProxyType(리터럴))을 읽는다.
+    # 찾은 표만 {표 이름: 값}으로 돌려주고, 읽을 수 없는 모양의 _init_<표>()는 ValueError
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), path)
+    constants = {}
+    for stmt in tree.body:
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)): continue
+        value = stmt.value
+        if (isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == 'MappingProxyType'
+                and len(value.args) == 1 and not value.keywords):
+            value = value.args[0]
+        try:
+            constants[stmt.targets[0].id] = ast.literal_eval(value)
+        except (ValueError, TypeError):
+            pass
+    tables = {}
+    for cls in tree.body:
+        if not isinstance(cls, ast.ClassDef) or cls.name not in RULESET_TABLES: continue
+        names = RULESET_TABLES[cls.name]
+        for node in cls.body:
+            if not isinstance(node, ast.FunctionDef): continue
+            if node.name == '__init__':
+                for stmt in ast.walk(node):
+                    if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1): continue
+                    target = stmt.targets[0]
+                    if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                            and target.value.id == 'self' and target.attr in names):
+                        if isinstance(stmt.value, ast.Name) and stmt.value.id in constants:
+                            tables[target.attr] = constants[stmt.value.id]
+                            continue
+                        try:
+                            tables[target.attr] = ast.literal_eval(stmt.value)
+                        except ValueError:
+                            pass    # self._init_...() 호출 등은 아래 메서드에서 읽는다
+            elif node.name.startswith('_init_') and node.name[len('_init_'):] in names:
+                try:
+                    tables[node.name[len('_init_'):]] = _literal_table(node.body)
+                except ValueError as e:
+                    raise ValueError(f'{path}:{node.lineno} {cls.name}.{node.name}: {e}') from None
+    return tables
+
+
+def _literal_table(body):
+    # _init_<표>() 본문으로 받아들이는 모양은 둘뿐이다 (그 밖은 ValueError):
+    #   return <리터럴>
+    #   d = <리터럴 dict>; for c in '<글자들>': d[c] = <리터럴>  (또는 if c not in d: d[c] = <리터럴>) ...; return d
+    if len(body) == 1 and isinstance(body[0], ast.Return) and body[0].value is not None:
+        return ast.literal_eval(body[0].value)
+    if not (len(body) >= 2 and isinstance(body[0], ast.Assign) and len(body[0].targets) == 1
+            and isinstance(body[0].targets[0], ast.Name) and isinstance(body[0].value, ast.Dict)):
+        raise ValueError('리터럴을 돌려주는 모양이 아님')
+    name = body[0].targets[0].id
+    table = ast.literal_eval(body[0].value)
+    if not (isinstance(body[-1], ast.Return) and isinstance(body[-1].value, ast.Name) and body[-1].value.id == name):
+        raise ValueError(f'마지막 줄이 return {name}이 아님')
+    for loop in body[1:-1]:
+        if not (isinstance(loop, ast.For) and isinstance(loop.target, ast.Name) and not loop.orelse
+                and isinstance(loop.iter, ast.Constant) and isinstance(loop.iter.value, str) and len(loop.body) == 1):
+            raise ValueError(f'{loop.lineno}행: 글자열을 도는 단순한 for 문이 아님')
+        var, stmt, only_new = loop.target.id, loop.body[0], False
+        if (isinstance(stmt, ast.If) and not stmt.orelse and len(stmt.body) == 1
+                and isinstance(stmt.test, ast.Compare) and len(stmt.test.ops) == 1
+                and isinstance(stmt.test.ops[0], ast.NotIn) and isinstance(stmt.test.left, ast.Name)
+                and stmt.test.left.id == var and isinstance(stmt.test.comparators[0], ast.Name)
+                and stmt.test.comparators[0].id == name):
+            stmt, only_new = stmt.body[0], True
+        if not (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Subscript)
+                and isinstance(stmt.targets[0].value, ast.Name) and stmt.targets[0].value.id == name
+                and isinstance(stmt.targets[0].slice, ast.Name) and stmt.targets[0].slice.id == var):
+            raise ValueError(f'{loop.lineno}행: {name}[{var}] = <리터럴> 모양이 아님')
+        value = ast.literal_eval(stmt.value)
+        for ch in loop.iter.value:
+            if not only_new or ch not in table: table[ch] = value
+    return table
+
+
+class SQLiteCache:
+    # 로컬 SQLite 파일에 두는 영구 캐시 (선택). 정규화한 수식 -> 대상, 입력 본문 해시 -> 교정 결과 전체.
+    # 모든 항목에 규칙 표 지문이 붙어 있어 규칙이 바뀌면 예전 항목은 쓰이지 않는다.
+    # 연결 하나를 잠금으로 감싸 여러 스레드가 함께 쓴다. 쓰기는 하나씩 바로 commit해 도중에 프로세스가 끝나도
+    # 이미 계산한 항목은 남는다 (WAL + synchronous=NORMAL이라 commit마다 fsync하지 않는다). 다 쓰면 close()
+    TABLES = {'targets': ('formula', 'target'), 'results': ('digest', 'result')}   # 표 -> (키 열, 값 열)
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            for table, (key_column, value_column) in self.TABLES.items():
+                self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (fingerprint TEXT, {key_column} TEXT, '
+                                  f'{value_column} TEXT, PRIMARY KEY (fingerprint, {key_column})) WITHOUT ROWID')
+            self.conn.commit()
+
+    def _get(self, table, fingerprint, key):
+        key_column, value_column = self.TABLES[table]
+        with self.lock:
+            row = self.conn.execute(f'SELECT {value_column} FROM {table} WHERE fingerprint = ? AND {key_column} = ?',
+                                    (fingerprint, key)).fetchone()
+            self.stats[f'{table} {"hit" if row else "miss"}'] += 1
+        return row[0] if row else None
+
+    def _put(self, table, fingerprint, key, value):
+        with self.lock:
+            self.conn.execute(f'INSERT OR REPLACE INTO {table} VALUES (?, ?, ?)', (fingerprint, key, value))
+            self.conn.commit()
+
+    def get_target(self, fingerprint, formula):
+        return self._get('targets', fingerprint, formula)
+
+    def put_target(self, fingerprint, formula, target):
+        self._put('targets', fingerprint, formula, target)
+
+    def get_result(self, fingerprint, digest):
+        return self._get('results', fingerprint, digest)
+
+    def put_result(self, fingerprint, digest, result):
+        self._put('results', fingerprint, digest, result)
+
+    def purge(self, keep_fingerprints):
+        # 지금 규칙 표의 지문이 아닌 항목을 지운다
+        marks = ','.join('?' * len(keep_fingerprints))
+        with self.lock:
+            for table in self.TABLES:
+                self.conn.execute(f'DELETE FROM {table} WHERE fingerprint NOT IN ({marks})', tuple(keep_fingerprints))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# 최종 텍스트, 수식 조사 기록, 맞춤법 기록, 최종 텍스트 기준 수식 색인, 수식 조사 판정 단계별 횟수,
+# 간이 판정 기록 (시간 예산 초과/긴 마지막 항으로 수식 끝부분만 보고 판정한 조사 모두. 오류 기록이 아님)
+CorrectionResult = namedtuple('CorrectionResult', ['text', 'josa_log', 'spell_log', 'math_spans', 'josa_stats', 'fallback_log'])
+# 교정 전 텍스트, 그 기준의 편집 목록(위치 순), 기록들, 교정 전 텍스트 기준 수식 색인, 단계별 횟수, 간이 판정 기록
+CorrectionEdits = namedtuple('CorrectionEdits', ['source', 'edits', 'josa_log', 'spell_log', 'math_spans', 'josa_stats',
+                                                 'fallback_log'])
+# 수식 조사 기록, 맞춤법 기록, limit에 닿아 끝까지 보지 않고 멈췄는지, 간이 판정 기록 (limit에 세지 않는다)
+LintResult = namedtuple('LintResult', ['josa_log', 'spell_log', 'stopped', 'fallback_log'])
+
+
+class CorrectionPipeline:
+    # 문서를 한 번만 수식/본문 조각으로 나누고, 본문 조각마다 수식 조사 교정과 맞춤법 교정을
+    # 이어서 적용한 뒤 한 번에 합친다 (JosaCorrector.run -> SpellingCorrector.run과 같은 결과와 기록).
+    # run은 결과를 돌려주기만 하고 인스턴스 상태를 바꾸지 않으므로, 한 인스턴스를 여러 스레드/세션이 함께 쓴다
+    # cache_path를 주면 SQLiteCache에 수식 대상과 입력별 결과를 남겨, 바뀌지 않은 입력은 다시 분석하지 않는다
+    # run_many/check_many로 여러 문서를 스레드 풀에 나눠 맡길 수 있다 (GIL 없는 빌드에서 여러 코어를 쓴다)
+    CHUNKS_PER_WORKER = 4
+
+    def __init__(self, josa_corrector=None, spell_corrector=None, cache_path=None):
+        self.josa_corrector = josa_corrector or JosaCorrector()
+        self.spell_corrector = spell_corrector or SpellingCorrector()
+        self.store = None
+        self._fingerprint = (None, None)
+        if cache_path is not None:
+            self.store = SQLiteCache(cache_path)
+            self.josa_corrector.persistent_cache = self.store
+
+    def close(self):
+        # 영구 캐시 연결을 닫는다 (닫은 뒤에는 캐시 없이 교정한다). with CorrectionPipeline(cache_path=...) as pipeline:
+        store, self.store = self.store, None
+        if store is None: return
+        if self.josa_corrector.persistent_cache is store: self.josa_corrector.persistent_cache = None
+        store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @classmethod
+    def from_ruleset(cls, tables, cache_path=None):
+        # load_ruleset으로 읽은 표를 쓰는 파이프라인 (없는 표는 이 판의 기본값)
+        josa, spell = JosaCorrector(), SpellingCorrector()
+        josa.set_tables(**{name: tables[name] for name in RULESET_TABLES['JosaCorrector'] if name in tables})
+        spell.set_tables(**{name: tables[name] for name in RULESET_TABLES['SpellingCorrector'] if name in tables})
+        return cls(josa, spell, cache_path)
+
+    def ruleset_fingerprint(self):
+        # 결과를 좌우하는 모든 규칙 표의 지문. 표는 읽기 전용이고 add_*/set_tables가 새 표를 바꿔 끼우므로
+        # 표가 같은 객체인지만 보고 바뀌었을 때 다시 계산한다 (표를 제자리에서 고치는 것은 지원하지 않는다)
+        josa, spell = self.josa_corrector, self.spell_corrector
+        tables = (josa.batchim_dict, josa.unit_batchim_dict, josa.particle_pairs, josa.protected_words, josa.hangul_as_words,
+                  spell.typo_dict, spell.text_rules, spell.exceptions, spell.korean_particle_pairs)
+        cached_tables, fingerprint = self._fingerprint
+        if cached_tables is None or any(a is not b for a, b in zip(cached_tables, tables)):
+            fingerprint = ruleset_fingerprint(*tables)
+            self._fingerprint = (tables, fingerprint)
+        return fingerprint
+
+    def run(self, raw_input, aggregate=False):
+        # aggregate=True면 기록을 FindingSummary로 묶어 돌려준다 (같은 오류는 한 행, 횟수와 문맥 예시 몇 개).
+        # 묶은 결과는 결과 캐시에 남기지 않는다 (캐시에 이미 있는 입력이면 그 기록을 묶어서 돌려준다)
+        text = self.josa_corrector.parse_input(raw_input)
+        store = self.store
+        if store is None: return self._run_text(text, aggregate)
+        fingerprint = self.ruleset_fingerprint()
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        cached = store.get_result(fingerprint, digest)
+        if cached is not None:
+            data = json.loads(cached)
+            josa_log, spell_log = FindingLog.from_rows(data['josa_log']), FindingLog.from_rows(data['spell_log'])
+            if aggregate: josa_log, spell_log = josa_log.summary(), spell_log.summary()
+            # 간이 판정이 섞인 결과는 캐시에 남기지 않으므로 간이 판정 기록은 늘 비어 있다
+            return CorrectionResult(data['text'], josa_log, spell_log,
+                                    MathSpanIndex(MathSpan(*span) for span in data['math_spans']),
+                                    Counter(data['josa_stats']), FindingSummary() if aggregate else FindingLog())
+        if aggregate: return self._run_text(text, aggregate)
+        result = self._run_text(text)
+        if result.josa_stats['간이 판정']: return result   # 간이 판정이 섞인 결과는 남기지 않는다
+        store.put_result(fingerprint, digest, json.dumps({
+            'text': result.text, 'josa_log': list(result.josa_log), 'spell_log': list(result.spell_log),
+            'math_spans': [list(span) for span in result.math_spans], 'josa_stats': result.josa_stats,
+        }, ensure_ascii=False))
+        return result
+
+    def edits(self, raw_input, aggregate=False):
+        # 교정된 글을 만들지 않고 편집 목록과 기록만 (진단만 필요할 때). 적용은 apply_edits(result.source, result.edits)
+        return self._edit_text(self.josa_corrector.parse_input(raw_input), aggregate)
+
+    def check(self, raw_input, limit=None):
+        # 검사만 (CI 등): 교정된 글도 편집 목록도 만들지 않고 기록만 모은다 (문맥은 기록을 꺼낼 때에야 만든다).
+        # limit를 주면 두 교정기 기록을 합쳐 limit개 이상이 된 본문 조각에서 바로 멈춘다 (limit=1이면 오류 유무만).
+        # 본문 조각은 앞에서부터 차례로 보므로 기록은 run()의 기록과 같고, 멈췄으면 그 앞부분이다
+        josa, spell = self.josa_corrector, self.spell_corrector
+        text = josa.parse_input(raw_input)
+        josa_log = FindingLog()
+        spell_log = FindingLog()
+        fallback_log = FindingLog()
+        spans = LazyMathSpanIndex(text)     # 일찍 멈추면 뒤쪽 수식은 찾지도 않는다
+        josa_stats = Counter()
+        document_deadline = josa.document_deadline()
+        pending = deque()   # 앞 구간들의 조사 편집 중 아직 본문 조각에 반영하지 않은 것
+        pos = 0
+        sentinel = MathSpan(len(text), len(text), None, len(text), len(text))
+        # 구간 하나를 읽을 때마다 그 앞 본문 조각을 검사하고, 그 구간 뒤 조사는 조각 검사가 끝나고 멈추지 않을 때만 판정한다
+        for span, match in chain(josa.scan_span_particles(text, spans), [(sentinel, None)]):
+            start = span.start
+            local = []
+            while pending and pending[0].start < start:
+                edit = pending.popleft()
+                local.append(edit._replace(start=edit.start - pos, end=edit.end - pos))
+            segment = apply_edits(text[pos:start], local) if local else text[pos:start]
+            if segment: spell.segment_edits(segment, spell_log)
+            if limit is not None and josa_log.total + spell_log.total >= limit:
+                return LintResult(josa_log, spell_log, True, fallback_log)
+            if match is not None:
+                edit = josa.particle_edit(josa_log, josa_stats, text, match, document_deadline, fallback_log)
+                if edit is not None: pending.append(edit)
+            pos = span.end
+        return LintResult(josa_log, spell_log, False, fallback_log)
+
+    def run_many(self, inputs, workers=None, aggregate=False):
+        # 여러 문서(또는 문단)를 스레드 풀에서 함께 교정하고 입력 순서대로 CorrectionResult 목록을 돌려준다.
+        # run은 인스턴스 상태를 바꾸지 않으므로 모든 스레드가 규칙 표와 캐시를 함께 쓴다 (프로세스 풀처럼 복사하지 않음)
+        return self._map(self.run, workers, inputs, repeat(aggregate))
+
+    def check_many(self, inputs, limit=None, workers=None):
+        # check의 여러 문서판 (입력 순서대로 LintResult 목록)
+        return self._map(self.check, workers, inputs, repeat(limit))
+
+    def _map(self, fn, workers, *iterables):
+        # workers를 주지 않으면 GIL이 없을 때 CPU 수만큼, GIL이 있으면 1 (순수 파이썬 교정은 스레드를 늘려도 한 코어만 쓴다).
+        # 입력 하나마다 작업을 넘기면 대기열 비용이 문제 하나 교정에 맞먹으므로, 스레드마다 몇 묶음씩 나눠 넘긴다
+        if workers is None: workers = 1 if gil_enabled() else (os.cpu_count() or 1)
+        if workers <= 1: return list(map(fn, *iterables))
+        items = list(zip(*iterables))
+        size = max(1, -(-len(items) // (workers * self.CHUNKS_PER_WORKER)))
+        with ThreadPoolExecutor(workers) as pool:
+            parts = pool.map(self._map_chunk, repeat(fn), (items[i:i + size] for i in range(0, len(items), size)))
+            return [result for part in parts for result in part]
+
+    @staticmethod
+    def _map_chunk(fn, chunk):
+        return [fn(*args) for args in chunk]
+
+    def _run_text(self, text, aggregate=False):
+        _, edits, josa_log, spell_log, spans, josa_stats, fallback_log = self._edit_text(text, aggregate)
+        shifts = [(e.start, len(e.replacement) - (e.end - e.start)) for e in edits]
+        return CorrectionResult(apply_edits(text, edits), josa_log, spell_log, spans.shifted(shifts), josa_stats, fallback_log)
+
+    def _edit_text(self, text, aggregate=False, spans=None, matches=None, segment_cache=None):
+        # 수식 조사 편집(text 기준)을 먼저 만들고, 그것을 반영한 본문 조각마다 맞춤법 편집을 만든 뒤
+        # compose_edits로 text 기준 편집 하나의 목록으로 합친다.
+        # spans/matches(수식 색인, scan_formula_particles 결과)는 규칙 표와 무관하므로 ShadowPipeline이 미리 구해 넘긴다.
+        # segment_cache: 본문 조각 -> (편집, 기록 호출). 맞춤법 표가 같은 판끼리 같은 조각의 결과를 다시 쓴다
+        josa, spell = self.josa_corrector, self.spell_corrector
+        josa_log = FindingSummary() if aggregate else FindingLog()
+        spell_log = FindingSummary() if aggregate else FindingLog()
+        fallback_log = FindingSummary() if aggregate else FindingLog()
+        josa_stats = Counter()
+        if spans is None: spans = MathSpanIndex.from_text(text)
+        josa_edits = list(josa.particle_edits(text, spans, josa_log, josa_stats, matches, fallback_log))
+        spell_edits = []    # 조사 교정을 반영한 글 기준
+        shift = 0
+        k = 0
+        pos = 0
+        for span in list(spans) + [MathSpan(len(text), len(text), None, len(text), len(text))]:
+            start = span.start
+            j = k
+            while j < len(josa_edits) and josa_edits[j].start < start: j += 1
+            if j > k:
+                # 본문 조각 text[pos:start]에 그 안의 조사 교정을 먼저 반영
+                local = [e._replace(start=e.start - pos, end=e.end - pos) for e in josa_edits[k:j]]
+                segment = apply_edits(text[pos:start], local)
+            else:
+                segment = text[pos:start]
+            if segment:
+                base = pos + shift
+                if segment_cache is None:
+                    seg_edits = spell.segment_edits(segment, spell_log)
+                else:
+                    cached = segment_cache.get(segment)
+                    if cached is None:
+                        recorder = FindingRecorder()
+                        cached = segment_cache[segment] = (spell.segment_edits(segment, recorder), recorder.calls)
+                    seg_edits = cached[0]
+                    FindingRecorder.replay(cached[1], spell_log)
+                spell_edits.extend(e._replace(start=e.start + base, end=e.end + base) for e in seg_edits)
+            shift += sum(len(e.replacement) - (e.end - e.start) for e in josa_edits[k:j])
+            k = j
+            pos = span.end
+        edits = compose_edits(text, josa_edits, spell_edits) if spell_edits else josa_edits
+        return CorrectionEdits(text, edits, josa_log, spell_log, spans, josa_stats, fallback_log)
+
+
+class FindingRecorder:
+    # FindingLog/FindingSummary 대신 받아 기록 호출만 모아 두고, 나중에 다른 기록에 그대로 되풀이한다
+    def __init__(self):
+        self.calls = []
+
+    def add(self, *args):
+        self.calls.append(('add', args))
+
+    def add_excerpt(self, *args, **kwargs):
+        self.calls.append(('add_excerpt', args, kwargs))
+
+    @staticmethod
+    def replay(calls, log):
+        for name, *rest in calls:
+            getattr(log, name)(*rest[0], **(rest[1] if len(rest) > 1 else {}))
+
+
+# 기준 판에는 없고 이 판에만 있는 편집, 기준 판에만 있는 편집 (둘 다 교정 전 텍스트 기준, 위치 순)
+VersionDiff = namedtuple('VersionDiff', ['added', 'removed'])
+# 교정 전 텍스트, {판 이름: CorrectionEdits}, {기준 외 판 이름: VersionDiff}
+ShadowResult = namedtuple('ShadowResult', ['source', 'versions', 'diffs'])
+
+
+class ShadowPipeline:
+    # 여러 규칙 표 판을 한 문서에 함께 돌려 본다 (새 규칙 판을 실제 입력에 그림자로 시험할 때).
+    # 입력 해석, 수식 색인, 수식 뒤 조사 찾기는 판과 무관하므로 한 번만 하고, 판마다 규칙 판정과 맞춤법만 따로 한다.
+    # 규칙 표가 모두 같은 판은 결과 하나를 함께 쓰고, 맞춤법 표가 같은 판끼리는 같은 본문 조각의 맞춤법 결과를 다시 쓴다.
+    # versions: {이름: CorrectionPipeline} (순서대로, 첫 판이 기준). 지문은 여기서 한 번 구하므로 이후 표를 바꾸면 새로 만든다
+    def __init__(self, versions):
+        self.versions = dict(versions)
+        if not self.versions: raise ValueError("판이 하나 이상 있어야 합니다")
+        self.baseline = next(iter(self.versions))
+        self.fingerprints = {}
+        self.spell_fingerprints = {}
+        for name, pipeline in self.versions.items():
+            spell = pipeline.spell_corrector
+            self.fingerprints[name] = pipeline.ruleset_fingerprint()
+            self.spell_fingerprints[name] = ruleset_fingerprint(spell.typo_dict, spell.text_rules,
+                                                                spell.exceptions, spell.korean_particle_pairs)
+
+    @classmethod
+    def from_files(cls, paths):
+        # {이름: 스크립트 경로} (이름 순서대로, 첫 판이 기준). 경로가 None이면 이 파일의 기본 규칙 표
+        return cls({name: CorrectionPipeline.from_ruleset(load_ruleset(path)) if path else CorrectionPipeline()
+                    for name, path in paths.items()})
+
+    def run(self, raw_input):
+        base = self.versions[self.baseline]
+        text = base.josa_corrector.parse_input(raw_input)
+        spans = MathSpanIndex.from_text(text)
+        matches = list(base.josa_corrector.scan_formula_particles(text, spans))
+        by_fingerprint = {}
+        segment_caches = {}
+        results = {}
+        for name, pipeline in self.versions.items():
+            fingerprint = self.fingerprints[name]
+            if fingerprint not in by_fingerprint:
+                segment_cache = segment_caches.setdefault(self.spell_fingerprints[name], {})
+                by_fingerprint[fingerprint] = pipeline._edit_text(text, spans=spans, matches=matches,
+                                                                  segment_cache=segment_cache)
+            results[name] = by_fingerprint[fingerprint]
+        base_edits = results[self.baseline].edits
+        base_keys = {edit[:3] for edit in base_edits}
+        diffs = {}
+        for name, result in results.items():
+            if name == self.baseline: continue
+            keys = {edit[:3] for edit in result.edits}
+            diffs[name] = VersionDiff([edit for edit in result.edits if edit[:3] not in base_keys],
+                                      [edit for edit in base_edits if edit[:3] not in keys])
+        return ShadowResult(text, results, diffs)
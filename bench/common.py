@@ -0,0 +1,53 @@
+# 벤치마크 공용: 저장소 루트의 addplusengine을 읽고, 수학 문제 비슷한 합성 문서를 만든다
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import addplusengine
+
+FORMULAS = [
+    'x', 'f(x)', 'a_n', 'a_{n+1}', '\\overline{AB}', 'x^2', 'x^{2}+1', '\\frac{1}{2}', '\\frac{a+b}{c}',
+    '\\sqrt{2}', '\\sqrt[3]{x}', '2\\pi r', '\\pi', '\\alpha+\\beta', '\\left(x+1\\right)^2', 'A^C',
+    '\\{1, 2, 3\\}', "f'(x)", '\\angle ABC', '10\\mathrm{cm}', '5\\text{kg}', 'x \\le 3', '1+2+\\cdots+n',
+    '\\lim_{x \\to \\infty} f(x)', '\\sum_{k=1}^{n} a_k', 'a \\times b', 'P(A)', '3', '7', 'k', 'l', 'm', 'n',
+]
+WORDS = ['함수', '그래프', '최댓값', '직선', '점', '넓이', '확률', '수열', '값', '길이', '조건', '원', '삼각형',
+         '사건', '실수', '정수', '해']
+PARTICLES = ['은', '는', '이', '가', '을', '를', '과', '와', '으로', '로', '의', '에서', '']
+
+
+def problems(n, error_rate=0.05, seed=0):
+    # 문제 n개 (문제마다 낱말/수식 8~20개). error_rate만큼의 조사는 받침과 상관없이 아무렇게나 붙인다
+    rnd = random.Random(seed)
+    josa = addplusengine.JosaCorrector()
+    spell = addplusengine.SpellingCorrector()
+    out = []
+    for _ in range(n):
+        sent = []
+        for _ in range(rnd.randint(8, 20)):
+            p = rnd.choice(PARTICLES)
+            if rnd.random() < 0.3:
+                f = rnd.choice(FORMULAS)
+                if p and p not in ('의', '에서') and rnd.random() > error_rate:
+                    p = josa.get_correct_p(josa.find_target(f), p)
+                sent.append('$' + f + '$' + p)
+                continue
+            w = rnd.choice(WORDS)
+            if p and rnd.random() > error_rate: p = spell._correct_josa(w[-1], p)
+            sent.append(w + p)
+        out.append(' '.join(sent) + '.')
+    return out
+
+
+def best_of(repeat, fn, *args):
+    # repeat번 돌려 가장 짧은 시간(초)과 마지막 결과
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - t
+        if best is None or elapsed < best: best = elapsed
+    return best, result
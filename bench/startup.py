@@ -0,0 +1,87 @@
+# 모듈 읽기/교정기 만들기 비용과, 미리 컴파일한 정규식(*_RE)이 수식 하나의 대상 분석에서 아끼는 시간.
+# 비교 열은 패턴 문자열을 매번 re 모듈에 넘기던 예전 방식을 흉내 낸다 (re 캐시를 거침 / 수식마다 re.purge로 캐시를 비움).
+#   python bench/startup.py --runs 15
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+from common import FORMULAS, addplusengine
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP = '''
+import sys, time
+t = time.perf_counter()
+import addplusengine
+t1 = time.perf_counter()
+addplusengine.CorrectionPipeline()
+t2 = time.perf_counter()
+print(t1 - t, t2 - t1, int('numpy' in sys.modules))
+'''
+
+
+class ThroughCache:
+    # 컴파일한 패턴 대신 패턴 문자열로 re 모듈을 거치는 패턴 (re.sub(문자열, ...)처럼 호출마다 캐시를 찾는다)
+    def __init__(self, compiled):
+        self.pattern, self.flags = compiled.pattern, compiled.flags
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: getattr(re.compile(self.pattern, self.flags), name)(*args, **kwargs)
+
+
+def compiled_patterns():
+    # 모듈의 클래스마다 미리 컴파일해 둔 *_RE 속성
+    for cls in vars(addplusengine).values():
+        if not isinstance(cls, type) or cls.__module__ != addplusengine.__name__: continue
+        for name, value in vars(cls).items():
+            if name.endswith('_RE') and isinstance(value, re.Pattern): yield cls, name, value
+
+
+def startup(runs):
+    times = [tuple(map(float, subprocess.check_output([sys.executable, '-c', STARTUP], cwd=ROOT).split()))
+             for _ in range(runs)]
+    return statistics.median(t[0] for t in times), statistics.median(t[1] for t in times), any(t[2] for t in times)
+
+
+def per_formula(josa, formulas, purge):
+    # 수식 하나의 대상 분석(캐시 없이) 평균 시간
+    canonical = [josa.canonicalize_formula(f) for f in formulas]
+    t = time.perf_counter()
+    for formula in canonical:
+        if purge: re.purge()
+        josa._find_target_uncached(formula)
+    return (time.perf_counter() - t) / len(canonical)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=15)
+    args = parser.parse_args()
+
+    patterns = list(compiled_patterns())
+    import_time, pipeline_time, numpy_loaded = startup(args.runs)
+    print('python', sys.version.split()[0], 'numpy available', addplusengine.load_numpy() is not None)
+    print('import addplusengine %.1f ms, CorrectionPipeline() %.1f ms (median of %d fresh processes), %d class-level patterns'
+          % (import_time * 1e3, pipeline_time * 1e3, args.runs, len(patterns)))
+    print('numpy loaded by import + CorrectionPipeline():', numpy_loaded)
+
+    # 수식 두 개를 연산/관계 기호로 이은 것까지 (마지막 항 찾기가 앞 항을 건너뛰어야 하도록)
+    formulas = FORMULAS + [a + op + b for a in FORMULAS for b in FORMULAS for op in ('+', '=')]
+    josa = addplusengine.JosaCorrector()
+    per_formula(josa, formulas, False)     # 첫 호출 비용(지연 준비 등)을 빼고 잰다
+    rows = [('precompiled', min(per_formula(josa, formulas, False) for _ in range(3)))]
+    try:
+        for cls, name, value in patterns: setattr(cls, name, ThroughCache(value))
+        rows.append(('through re cache', min(per_formula(josa, formulas, False) for _ in range(3))))
+        rows.append(('re.purge per formula', min(per_formula(josa, formulas, True) for _ in range(3))))
+    finally:
+        for cls, name, value in patterns: setattr(cls, name, value)
+    print('find_target without the target cache, %d distinct formulas:' % len(formulas))
+    for label, seconds in rows: print('  %-22s %6.1f us/formula' % (label, seconds * 1e6))
+
+
+if __name__ == '__main__':
+    main()
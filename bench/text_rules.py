@@ -0,0 +1,62 @@
+# 선언형 규칙(TextRule) 수에 따른 비용: 50개에서 5,000개까지. 규칙 다섯 개 중 하나는 앞/뒤 조건이 있다.
+# 비교용 '규칙마다' 열은 규칙 하나마다 정규식 한 번씩 글을 훑는 방식이다.
+#   python bench/text_rules.py --rules 50 500 5000 --problems 5000
+import argparse
+import random
+import re
+import time
+
+from common import addplusengine, best_of, problems
+
+SYLLABLES = [chr(c) for c in range(ord('가'), ord('힣') + 1, 97)]
+CONDITIONS = [(None, '(?![가-힣])'), ('(?<![가-힣])', None), ('(?<![가-힣])', '(?![가-힣])')]
+
+
+def random_rules(n, seed):
+    rnd = random.Random(seed)
+    rules = []
+    for i in range(n):
+        pattern = ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        before, after = rnd.choice(CONDITIONS) if i % 5 == 0 else (None, None)
+        rules.append(addplusengine.TextRule(pattern, pattern[::-1], before=before, after=after))
+    return rules
+
+
+def one_pass_per_rule(compiled, docs):
+    # 규칙마다 (조건을 붙인 정규식으로) 글을 한 번씩 훑는다
+    found = 0
+    for doc in docs:
+        for regex in compiled: found += len(regex.findall(doc))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rules', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--problems', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    docs = problems(args.problems, seed=22)
+    print('problems %d, chars/doc %.0f' % (len(docs), sum(map(len, docs)) / len(docs)))
+    print('  rules   build ms  matcher us/doc  correct_segment us/doc  one pass per rule us/doc')
+    for n in args.rules:
+        rules = random_rules(n, seed=n)
+        # 규칙 패턴이 본문에 실제로 나오도록 문제 열 개 중 하나에 섞어 넣는다
+        rnd = random.Random(n)
+        sample = [doc + ' ' + rnd.choice(rules).pattern + ' 값.' if i % 10 == 0 else doc for i, doc in enumerate(docs)]
+        spell = addplusengine.SpellingCorrector()
+        t = time.perf_counter()
+        spell.add_rules(rules)
+        build = time.perf_counter() - t
+        automaton = spell.typo_automaton
+        matcher, _ = best_of(args.repeat, lambda: [automaton.match(doc) for doc in sample])
+        segment, _ = best_of(args.repeat, lambda: [spell.correct_segment(doc, addplusengine.FindingLog()) for doc in sample])
+        compiled = [re.compile((rule.before or '') + re.escape(rule.pattern) + (rule.after or '')) for rule in rules]
+        baseline, _ = best_of(1, one_pass_per_rule, compiled, sample)
+        per_doc = 1e6 / len(sample)
+        print('%7d %10.1f %15.1f %23.1f %25.1f' % (len(rules), build * 1e3, matcher * per_doc, segment * per_doc, baseline * per_doc))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# CorrectionPipeline.run_many의 스레드 수에 따른 처리 시간.
+# GIL 없는 빌드(python3.13t 등)에서 돌려야 여러 코어를 쓰는지 볼 수 있다. GIL이 있으면 스레드를 늘려도 빨라지지 않는다.
+#   python3.13t bench/thread_scaling.py --problems 20000 --max-workers 32
+# 첫 줄의 gil_enabled가 True이면 GIL이 켜진 채로 잰 것이다 (GIL을 쓰는 확장 모듈, 예컨대 자유 스레드를
+# 지원하지 않는 numpy를 읽으면 다시 켜진다. 그때는 PYTHON_GIL=0 또는 -X gil=0으로 강제할 수 있다)
+import argparse
+import os
+import sys
+
+from common import addplusengine, best_of, problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--problems', type=int, default=5000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    docs = problems(args.problems, seed=7)
+    pipeline = addplusengine.CorrectionPipeline()
+    print('python', sys.version.split()[0], 'gil_enabled', addplusengine.gil_enabled(),
+          'numpy loaded', 'numpy' in sys.modules, 'cpus', os.cpu_count())
+    pipeline.run_many(docs, 1)     # 수식 대상 캐시를 채워 둔다 (모든 스레드 수가 같은 조건에서 재도록)
+    serial_time, serial = best_of(args.repeat, pipeline.run_many, docs, 1)
+    expected = [(r.text, list(r.josa_log), list(r.spell_log)) for r in serial]
+    print('problems %d, chars %d' % (len(docs), sum(map(len, docs))))
+    print('workers  seconds  speedup  same-as-serial')
+    workers = 1
+    while True:
+        elapsed, results = best_of(args.repeat, pipeline.run_many, docs, workers)
+        same = expected == [(r.text, list(r.josa_log), list(r.spell_log)) for r in results]
+        print('%7d  %7.3f  %7.2f  %s' % (workers, elapsed, serial_time / elapsed, same))
+        if workers >= args.max_workers: break
+        workers = min(workers * 2, args.max_workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# 오탈자 사전 크기(100 / 1만 / 10만 항목)에 따른 TypoAutomaton 만들기와 SpellingCorrector.run 시간.
+# 비교용 '항목마다' 열은 예전 방식 (사전 항목마다 본문 조각 전체에서 in/replace)을 그대로 흉내 낸 것이다.
+#   python bench/typo_automaton.py --sizes 100 10000 100000 --chars 90000
+import argparse
+import random
+
+from common import addplusengine, best_of, problems
+
+SYLLABLES = [chr(c) for c in range(ord('가'), ord('힣') + 1, 97)]   # 한글 음절 약 120개
+
+
+def random_dict(n, seed):
+    # 2~4음절 낱말 n개 -> 끝 음절만 바꾼 낱말
+    rnd = random.Random(seed)
+    words = {}
+    while len(words) < n:
+        wrong = ''.join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4)))
+        words[wrong] = wrong[:-1] + rnd.choice(SYLLABLES)
+    return words
+
+
+def per_entry_replace(text, typo_dict):
+    # 예전 방식: 수식 밖 본문 조각마다 사전 항목을 하나씩 찾아 바꾼다
+    parts = addplusengine.MathSpanIndex.from_text(text).split(text)
+    for i in range(0, len(parts), 2):
+        part = parts[i]
+        for wrong, correct in typo_dict.items():
+            if wrong in part: part = part.replace(wrong, correct)
+        parts[i] = part
+    return ''.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--chars', type=int, default=90000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-baseline', action='store_true', help='항목마다 찾는 비교 열을 건너뛴다 (10만 항목이면 오래 걸림)')
+    args = parser.parse_args()
+
+    text = ''
+    docs = iter(problems(100000, seed=10))
+    while len(text) < args.chars: text += next(docs) + '\n'
+    print('text chars %d' % len(text))
+    print('   entries   states  build s  run s  per-entry run s  hits')
+    for size in args.sizes:
+        typo_dict = random_dict(size, seed=size)
+        build, automaton = best_of(1, addplusengine.TypoAutomaton, typo_dict)
+        spell = addplusengine.SpellingCorrector()
+        spell.add_typos(typo_dict)
+        # 사전 낱말이 본문에 실제로 나오도록 몇 개를 섞어 넣는다
+        rnd = random.Random(size)
+        sample = rnd.sample(sorted(typo_dict), min(50, size))
+        lines = text.split('\n')
+        for word in sample: lines[rnd.randrange(len(lines))] += ' ' + word + ' 값.'
+        doc = '\n'.join(lines)
+        run, (_, log) = best_of(args.repeat, spell.run, doc)
+        hits = sum(1 for row in log if row['사유'] == '맞춤법/표준어 오류')
+        if args.no_baseline: baseline = '-'
+        else: baseline = '%.3f' % best_of(1, per_entry_replace, doc, spell.typo_dict)[0]
+        print('%10d %8d %8.2f %6.3f %16s %5d' % (size, len(automaton.goto), build, run, baseline, hits))
+
+
+if __name__ == '__main__':
+    main()
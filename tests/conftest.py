@@ -0,0 +1,32 @@
+# 테스트 공용: 수학 문제 비슷한 합성 문서를 만드는 make_docs 픽스처
+import random
+
+import pytest
+
+FORMULAS = [
+    'x', 'f(x)', 'a_n', 'x^2', '\\frac{1}{2}', '\\sqrt{2}', '\\pi', 'A^C', "f'(x)", '10\\mathrm{cm}', 'x \\le 3',
+    '\\overline{AB}', '3', '7', 'l', 'n', '\\{1, 2, 3\\}', '\\angle ABC', '\\,',
+]
+# 맞춤법 교정기가 고치는 낱말(최대값, 어떻해, 꼭지점, 사과은의 '과은' 등)도 섞는다
+WORDS = ['함수', '그래프', '최댓값', '최대값', '직선', '점', '꼭지점', '넓이', '확률', '값', '길이', '원', '실수', '해',
+         '사과', '어떻해']
+PARTICLES = ['은', '는', '이', '가', '을', '를', '과', '와', '으로', '로', '의', '', ', ', '는 ', '.', '... ', '를 가진다.']
+
+
+def generate_docs(n, seed, formula_rate=0.5, size=(1, 20), joiners=(' ', '\n')):
+    # 문서 n개. 문서마다 size 범위만큼의 '수식+조사'(formula_rate 비율)와 '낱말+조사'를 joiners 중 하나로 잇는다.
+    # 조사는 받침과 상관없이 아무렇게나 붙인다
+    rnd = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        words = []
+        for _ in range(rnd.randint(*size)):
+            if rnd.random() < formula_rate: words.append('$%s$%s' % (rnd.choice(FORMULAS), rnd.choice(PARTICLES)))
+            else: words.append(rnd.choice(WORDS) + rnd.choice(PARTICLES))
+        docs.append(rnd.choice(joiners).join(words) + '.')
+    return docs
+
+
+@pytest.fixture(scope='session')
+def make_docs():
+    return generate_docs
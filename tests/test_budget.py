@@ -0,0 +1,62 @@
+# 수식 분석 시간 예산: 실제로 시간이 지난 것만 '시간 예산 초과'이다. 간이 판정은 모두 fallback_log에 남고,
+# 오류 기록(josa_log)에는 조사가 바뀐 것만 남는다
+from addplusengine import CorrectionPipeline
+
+PMATRIX = '$\\begin{pmatrix} ' + ' & '.join('a_{%d}' % i for i in range(300)) + ' \\end{pmatrix}$'
+
+
+def make_pipeline(formula_budget=0.5, document_budget=5.0):
+    pipeline = CorrectionPipeline()
+    pipeline.josa_corrector.formula_budget = formula_budget
+    pipeline.josa_corrector.document_budget = document_budget
+    return pipeline
+
+
+def test_long_term_is_not_a_budget_overrun():
+    pipeline = make_pipeline()
+    result = pipeline.run(PMATRIX + '는 행렬이다.')
+    assert list(result.josa_log) == []
+    assert result.josa_stats['긴 마지막 항'] == 1 and result.josa_stats['간이 판정 그대로'] == 1
+    assert result.josa_stats['예산 초과'] == 0
+    assert [(row['원문'], row['수정'], row['사유']) for row in result.fallback_log] == [
+        ('는', '는', '마지막 항이 너무 김 (수식 끝부분만 분석)')]
+
+    result = pipeline.run(PMATRIX + '은 행렬이다.')
+    assert [(row['원문'], row['수정'], row['사유']) for row in result.josa_log] == [
+        ('은', '는', '마지막 항이 너무 김 (수식 끝부분만 분석)')]
+    assert list(result.fallback_log) == list(result.josa_log)
+    assert result.text == PMATRIX + '는 행렬이다.'
+
+
+def test_unchanged_fallback_is_still_reported():
+    # 긴 아래 첨자: 조사는 그대로지만 끝부분만 보고 판정했다는 기록은 남는다 (run, aggregate, check 모두)
+    pipeline = make_pipeline()
+    text = '$x_' + '\\a' * 20000 + '1$은 값이다.'
+    result = pipeline.run(text)
+    assert result.text == text and list(result.josa_log) == []
+    assert [(row['원문'], row['수정']) for row in result.fallback_log] == [('은', '은')]
+    assert pipeline.run(text, aggregate=True).fallback_log.total == 1
+    lint = pipeline.check(text, limit=1)
+    assert not lint.stopped and lint.fallback_log.total == 1
+
+
+def test_long_term_without_budget_is_analysed_in_full():
+    result = make_pipeline(None, None).run(PMATRIX + '은 행렬이다.')
+    assert result.josa_stats['간이 판정'] == 0
+    assert [row['사유'] for row in result.josa_log] == ['받침 호응 오류']
+
+
+def test_spent_budget_reports_every_fallback():
+    # 예산 0: 분석을 시작하자마자 시간이 지난 것으로 본다
+    pipeline = make_pipeline(0.0, None)
+    result = pipeline.run('$x+1$은 양수이고 $y+2$은 음수이다.')
+    assert result.josa_stats['예산 초과'] == 2 and result.josa_stats['간이 판정 그대로'] == 1
+    assert [(row['원문'], row['수정'], row['사유']) for row in result.josa_log] == [
+        ('은', '는', '시간 예산 초과 (수식 끝부분만 분석)')]
+    assert [(row['원문'], row['수정'], row['사유']) for row in result.fallback_log] == [
+        ('은', '은', '시간 예산 초과 (수식 끝부분만 분석)'), ('은', '는', '시간 예산 초과 (수식 끝부분만 분석)')]
+
+
+def test_no_fallback_without_budget():
+    result = make_pipeline(None, None).run('$x+1$은 양수이고 $y+2$은 음수이다.')
+    assert result.fallback_log.total == 0
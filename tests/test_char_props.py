@@ -0,0 +1,46 @@
+# 두 교정기가 함께 쓰는 글자 속성 표(CharProps)로 내리는 받침/ㄹ 받침 판정
+import pytest
+
+from addplusengine import CorrectionPipeline, JosaCorrector, SpellingCorrector
+
+
+@pytest.fixture(scope='module')
+def josa():
+    return JosaCorrector()
+
+
+@pytest.mark.parametrize('target, particle, expected', [
+    ('x', '은', '는'), ('3', '는', '은'), ('7', '으로', '로'), ('l', '으로', '로'), ('ㄹ', '으로', '로'),
+    ('6', '로', '으로'), ('\\alpha', '은', '는'), ('프라임', '는', '은'), ('UNIT:cm', '은', '는'),
+    # 기본 판정: ㄹ 받침 음절도 '으로', ㉠-㉭은 받침 사전에 없으므로 받침 없음. 사전에 없는 단위의 끝 글자는 받침 없음
+    ('달', '로', '으로'), ('㉠', '는', '는'), ('㉠', '은', '는'), ('㉣', '로', '로'), ('UNIT:원', '는', '는'),
+])
+def test_formula_target(josa, target, particle, expected):
+    assert josa.get_correct_p(target, particle) == expected
+
+
+@pytest.mark.parametrize('target, particle, expected', [
+    # hangul_as_words: ㄹ 받침 음절과 ㉣은 '로', ㉠-㉭은 자음 이름으로 읽어 받침이 있다 (본문 낱말과 같은 판정)
+    ('달', '으로', '로'), ('달', '로', '로'), ('밤', '로', '으로'), ('㉠', '는', '은'), ('㉣', '으로', '로'),
+    ('㉡', '로', '으로'),
+    # 나머지 대상은 기본 판정과 같다
+    ('x', '은', '는'), ('7', '으로', '로'), ('ㄹ', '으로', '로'), ('프라임', '는', '은'), ('UNIT:원', '는', '는'),
+])
+def test_formula_target_read_as_words(target, particle, expected):
+    assert JosaCorrector(hangul_as_words=True).get_correct_p(target, particle) == expected
+
+
+def test_read_as_words_in_pipeline():
+    default, words = CorrectionPipeline(), CorrectionPipeline(JosaCorrector(hangul_as_words=True))
+    text = '$㉠$는 $달$으로 간다.'
+    assert default.run(text).text == text
+    assert words.run(text).text == '$㉠$은 $달$로 간다.'
+    assert default.ruleset_fingerprint() != words.ruleset_fingerprint()
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('사과는 ', '사과는 '), ('사과은 ', '사과는 '), ('달으로 ', '달로 '), ('밤로 ', '밤으로 '),
+    ('㉠는 ', '㉠은 '), ('㉣으로 ', '㉣로 '), ('㉡로 ', '㉡으로 '),
+])
+def test_word_particle(text, expected):
+    assert SpellingCorrector().run(text)[0] == expected
@@ -0,0 +1,38 @@
+# CorrectionPipeline.check: 기록은 run()과 같고, limit로 멈추면 그 앞부분이며, 멈춘 뒤쪽 수식은 판정하지 않는다
+import pytest
+
+from addplusengine import CorrectionPipeline
+
+
+@pytest.fixture(scope='module')
+def pipeline():
+    return CorrectionPipeline()
+
+
+def test_check_matches_run(pipeline, make_docs):
+    for doc in make_docs(500, seed=21):
+        result = pipeline.run(doc)
+        full = pipeline.check(doc)
+        assert not full.stopped
+        assert list(full.josa_log) == list(result.josa_log)
+        assert list(full.spell_log) == list(result.spell_log)
+        for limit in (1, 2, 3):
+            lint = pipeline.check(doc, limit=limit)
+            josa, spell = list(lint.josa_log), list(lint.spell_log)
+            assert josa == list(result.josa_log)[:len(josa)]
+            assert spell == list(result.spell_log)[:len(spell)]
+            assert lint.stopped == (len(josa) + len(spell) >= limit)
+            assert lint.stopped or len(result.josa_log) + len(result.spell_log) < limit
+
+
+def test_check_stops_before_later_formulas(pipeline, monkeypatch):
+    # 첫 오류가 첫 본문 조각의 오탈자면 뒤쪽 수식 뒤 조사는 하나도 판정하지 않는다
+    calls = []
+    particle_edit = pipeline.josa_corrector.particle_edit
+    monkeypatch.setattr(pipeline.josa_corrector, 'particle_edit', lambda *args: calls.append(args) or particle_edit(*args))
+    lint = pipeline.check('최대값이 있다. ' + '$x$는 값이다. ' * 1000, limit=1)
+    assert lint.stopped and lint.spell_log.total == 1
+    assert calls == []
+    lint = pipeline.check('$x$는 값이다. ' * 3 + '최대값이 있다. ' + '$x$는 값이다. ' * 1000, limit=1)
+    assert lint.stopped and lint.spell_log.total == 1
+    assert len(calls) == 3
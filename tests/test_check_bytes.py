@@ -0,0 +1,21 @@
+# JosaCorrector.check_bytes: 기록의 '위치'는 고칠 한글 조사만 덮는 바이트 구간이다
+from addplusengine import JosaCorrector
+
+
+def test_position_covers_the_particle_only():
+    buf = '$x^2$를 가진다. 최대값은 '.encode('utf-8')
+    log, _ = JosaCorrector().check_bytes(buf)
+    assert [(row['원문'], row['수정'], row['위치']) for row in log] == [('를', '을', (5, 8))]
+
+
+def test_positions_match_the_original_particle(make_docs):
+    josa = JosaCorrector()
+    rows = 0
+    for doc in make_docs(300, seed=17, formula_rate=1.0, size=(1, 8), joiners=(' 그리고 ',)):
+        buf = doc.encode('utf-8')
+        log, _ = josa.check_bytes(buf, window=8)
+        for row in log:
+            start, end = row['위치']
+            assert buf[start:end].decode('utf-8') == row['원문']
+        rows += len(log)
+    assert rows
@@ -0,0 +1,62 @@
+# 한 CorrectionPipeline을 여러 스레드가 함께 써도 결과가 순서대로 돌린 run()과 같은지
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from addplusengine import CorrectionPipeline
+
+
+def key(result):
+    return result.text, list(result.josa_log), list(result.spell_log), result.math_spans.spans, result.josa_stats
+
+
+@pytest.fixture(scope='module')
+def docs(make_docs):
+    return make_docs(2000, seed=12, size=(3, 25))
+
+
+def test_thread_pool_matches_serial(docs):
+    pipeline = CorrectionPipeline()
+    expected = [key(pipeline.run(doc)) for doc in docs]
+    for _ in range(3):
+        with ThreadPoolExecutor(32) as pool:
+            results = list(pool.map(pipeline.run, docs))
+        assert [key(result) for result in results] == expected
+
+
+def test_thread_pool_with_concurrent_rule_updates(docs):
+    # 다른 스레드가 보호 단어/오탈자를 계속 늘리는 동안에도 읽는 쪽은 옛 표나 새 표 하나만 본다
+    # (늘리는 단어는 문서에 나오지 않으므로 결과는 그대로여야 한다)
+    pipeline = CorrectionPipeline()
+    expected = [key(pipeline.run(doc)) for doc in docs]
+    stop = threading.Event()
+    updates = []
+
+    def writer():
+        k = 0
+        while not stop.is_set():
+            pipeline.josa_corrector.add_protected_words(['보호%d' % k])
+            pipeline.spell_corrector.add_typos({'없는말%d' % k: '고친말'})
+            k += 1
+        updates.append(k)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        with ThreadPoolExecutor(32) as pool:
+            results = list(pool.map(pipeline.run, docs))
+    finally:
+        stop.set()
+        thread.join()
+    assert updates[0] > 0
+    assert [key(result) for result in results] == expected
+
+
+def test_run_many_matches_serial(docs):
+    pipeline = CorrectionPipeline()
+    expected = [key(pipeline.run(doc)) for doc in docs]
+    assert [key(result) for result in pipeline.run_many(docs, workers=8)] == expected
+    lint = [pipeline.check(doc, limit=1) for doc in docs]
+    assert [(list(r.josa_log), list(r.spell_log), r.stopped) for r in pipeline.check_many(docs, limit=1, workers=8)] == \
+           [(list(r.josa_log), list(r.spell_log), r.stopped) for r in lint]
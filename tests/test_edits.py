@@ -0,0 +1,49 @@
+# apply_edits / compose_edits: 원문 위치 기준 편집 목록을 한 번에 적용하고, 두 단계 편집을 원문 기준 하나로 합친다
+import io
+import random
+
+from addplusengine import Edit, apply_edits, compose_edits
+
+
+def random_edits(rnd, text, rule):
+    # 위치 순, 겹치지 않는 편집 (닿는 것, 빈 구간에 끼워 넣기, 지우기 포함)
+    edits = []
+    pos = 0
+    while pos <= len(text) and rnd.random() < 0.7:
+        start = rnd.randint(pos, min(len(text), pos + 4))
+        end = rnd.randint(start, min(len(text), start + 3))
+        if start == end and edits and edits[-1].end == start: break
+        edits.append(Edit(start, end, ''.join(rnd.choice('xyz') for _ in range(rnd.randint(0, 3))), rule))
+        pos = end if end > start else end + 1
+    return edits
+
+
+def test_compose_matches_applying_in_turn():
+    rnd = random.Random(18)
+    for _ in range(20000):
+        text = ''.join(rnd.choice('abcd') for _ in range(rnd.randint(0, 12)))
+        first = random_edits(rnd, text, 'first')
+        middle = apply_edits(text, first)
+        second = random_edits(rnd, middle, 'second')
+        composed = compose_edits(text, first, second)
+        assert apply_edits(text, composed) == apply_edits(middle, second), (text, first, second)
+        assert all(a.end <= b.start for a, b in zip(composed, composed[1:])), composed
+        assert all(0 <= edit.start <= edit.end <= len(text) for edit in composed)
+
+
+def test_overlapping_edits_merge():
+    text = '가나다라'
+    first = [Edit(1, 2, '바', 'typo')]
+    second = [Edit(1, 3, '사', 'word_josa'), Edit(3, 4, '아', 'word_josa')]
+    assert compose_edits(text, first, second) == [Edit(1, 3, '사', 'typo+word_josa'), Edit(3, 4, '아', 'word_josa')]
+    # 닿기만 하는 편집은 따로 둔다
+    assert compose_edits(text, [Edit(0, 1, 'ab', 'typo')], [Edit(2, 3, 'c', 'word_josa')]) == [
+        Edit(0, 1, 'ab', 'typo'), Edit(1, 2, 'c', 'word_josa')]
+
+
+def test_apply_edits_writes_to_buffer():
+    text = '$x$은 최대값이다.'
+    edits = [Edit(3, 4, '는', 'formula_josa'), Edit(5, 8, '최댓값', 'typo')]
+    out = io.StringIO()
+    assert apply_edits(text, edits, out) is None
+    assert out.getvalue() == apply_edits(text, edits) == '$x$는 최댓값이다.'
@@ -0,0 +1,122 @@
+# find_target: 수식 → 조사를 정하는 대상. data/find_target_cases.json은 트리 이전(문자열 치환) 판의 결과를 적어 둔 것
+import json
+import os
+import random
+import re
+
+import pytest
+
+from addplusengine import IrregularFormula, JosaCorrector
+
+CASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'find_target_cases.json')
+
+
+@pytest.fixture(scope='module')
+def cases():
+    with open(CASES_PATH, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def last_term_path(josa, formula):
+    # 마지막 항을 구하는 경로: 역방향 빠른 경로, 토큰 트리, 문자열 치환(legacy)
+    if josa._last_term_fast(formula) is not None: return 'fast'
+    try:
+        josa.term_parser.last_term(josa.canonicalize_formula(formula))
+    except IrregularFormula:
+        return 'legacy'
+    return 'tree'
+
+
+def test_matches_recorded_targets(cases):
+    josa = JosaCorrector()
+    found = [(formula, josa.find_target(formula)) for formula, _ in cases]
+    assert [pair for pair, (_, expected) in zip(found, cases) if pair[1] != expected] == []
+
+
+def test_cases_cover_every_path(cases):
+    josa = JosaCorrector()
+    counts = {'fast': 0, 'tree': 0, 'legacy': 0}
+    for formula, _ in cases:
+        counts[last_term_path(josa, formula)] += 1
+    assert min(counts.values()) >= 100, counts
+
+
+@pytest.mark.parametrize('formula, path, expected', [
+    ('x^2+1', 'fast', '1'), ('\\frac{a+b}{c}', 'fast', 'b'), ('60^\\circ', 'fast', '도'), ('A^C', 'fast', '여집합'),
+    ('10\\mathrm{cm}', 'fast', 'UNIT:cm'), ('\\sqrt[3]{x}', 'tree', 'x'), ('a}+b', 'tree', 'b'),
+    ('{x+1', 'legacy', '1'), ('\\frac{1}2', 'legacy', '2'),
+])
+def test_single_formula(formula, path, expected):
+    josa = JosaCorrector()
+    assert last_term_path(josa, formula) == path
+    assert josa.find_target(formula) == expected
+
+
+def full_last_term(josa, formula):
+    canonical = josa.canonicalize_formula(formula)
+    try:
+        return josa.term_parser.last_term(canonical)
+    except IrregularFormula:
+        return josa._last_term_legacy(canonical)
+
+
+def test_fast_path_agrees_with_full_parse(cases):
+    josa = JosaCorrector()
+    fast = [(formula, josa._last_term_fast(formula)) for formula, _ in cases]
+    assert [(formula, term) for formula, term in fast
+            if term is not None and term != full_last_term(josa, formula)] == []
+
+
+@pytest.mark.parametrize('formula, offset', [
+    ('x\\le\\alpha', 4), ('\\cdotp', 5), ('\\left(x+1\\right)', 8), ('a^ +b', 0), ('x^{+}', 0), ('{a=b}', 0),
+])
+def test_split_offset(formula, offset):
+    assert JosaCorrector().term_parser.last_split_offset(formula) == offset
+
+
+@pytest.mark.parametrize('formula', [
+    # 괄호 짝이 안 맞음, '\\', \sqrt[n], 인자가 그룹 둘이 아닌 \frac, 공백/간격 명령을 지우면 명령어 이름이 바뀜
+    '{x+1', 'a}+b', 'a\\\\b+c', '\\sqrt[3]{x}+1', 'x+\\sqrt [n]{y}', '\\frac12+x', 'a \\in B', 'a\\quad b',
+])
+def test_fast_path_gives_up(formula):
+    josa = JosaCorrector()
+    assert josa.term_parser.last_split_offset(formula) is None
+    assert josa._last_term_fast(formula) is None
+
+
+def placeholder_last_term(josa, canonical):
+    # 예전 방식: 최상위 그룹을 @BRACEn@ 자리표시로 바꾼 뒤 나누고 되돌리는 기준 구현
+    masked = josa._simplify_canonical(canonical)
+    groups = []
+    while True:
+        start = masked.find('{')
+        if start == -1: break
+        content, end = josa.get_balanced(masked, start)
+        if content is None: break
+        masked = masked[:start] + '@BRACE%d@' % len(groups) + masked[end:]
+        groups.append(content)
+    term = re.split(r'=|\\approx|\\ne|>|<|\\ge|\\le|\\times|\\div|(?<!\^)\+|(?<!\^)-|\\cdot|'
+                    r'\\cap|\\cup|\\setminus|\\subset|\\subseteq|\\in|\\ni', masked)[-1]
+    while '@BRACE' in term:
+        for i, content in enumerate(groups):
+            term = term.replace('@BRACE%d@' % i, '{' + content + '}')
+    return term
+
+
+def test_legacy_path_matches_placeholder_masking(cases):
+    josa = JosaCorrector()
+    rnd = random.Random(3)
+    canonicals = [josa.canonicalize_formula(formula) for formula, _ in cases]
+    for canonical in canonicals[:300]:
+        # 짝 없는 괄호를 끼워 넣어 닫히지 않는 '{' 앞에서 멈추는 경우도 본다
+        k = rnd.randrange(len(canonical) + 1)
+        canonicals.append(canonical[:k] + rnd.choice('{}') + canonical[k:])
+    assert [(canonical, josa._last_term_legacy(canonical)) for canonical in canonicals
+            if josa._last_term_legacy(canonical) != placeholder_last_term(josa, canonical)] == []
+
+
+@pytest.mark.parametrize('text, groups', [
+    ('a{b}c{d{e}}', [(1, 4), (5, 11)]), ('{a}}{b}', [(0, 3), (4, 7)]), ('{a}{b', [(0, 3)]), ('}{', []),
+])
+def test_top_level_groups(text, groups):
+    assert JosaCorrector().top_level_groups(text) == groups
@@ -0,0 +1,45 @@
+# FindingLog: 열로 모아 둔 기록을 예전 dict의 list처럼 읽는다 (문맥은 꺼낼 때 만든다)
+import itertools
+
+import pytest
+
+from addplusengine import CorrectionPipeline, FindingLog
+
+TEXT = '$x$은 최대값이고 $f(x)$을 구한다.\n사과은 $3$는 꼭지점이다. $a_n$로 둔다.'
+
+
+@pytest.fixture(scope='module')
+def logs():
+    result = CorrectionPipeline().run(TEXT)
+    return result.josa_log, result.spell_log
+
+
+def test_reads_like_a_list(logs):
+    for log in logs:
+        rows = list(log)
+        assert len(log) == len(rows) == log.total and bool(log) == bool(rows)
+        for i in range(-len(rows), len(rows)):
+            assert log[i] == rows[i]
+        for i in (len(rows), -len(rows) - 1, 100):
+            with pytest.raises(IndexError):
+                log[i]
+        bounds = [None, -100, -3, -1, 0, 1, 2, 100]
+        for start, stop, step in itertools.product(bounds, bounds, [None, 1, 2, -1, -2]):
+            assert log[start:stop:step] == rows[start:stop:step]
+        with pytest.raises(TypeError):
+            log['0']
+
+
+def test_rows_and_context(logs):
+    josa_log, spell_log = logs
+    assert [(row['원문'], row['수정']) for row in josa_log] == [('은', '는'), ('을', '를'), ('는', '은'), ('로', '으로')]
+    assert [(row['대상'], row['수정']) for row in spell_log] == [('최대값', '최댓값'), ('과은', '는'), ('꼭지점', '꼭짓점')]
+    assert josa_log[0]['문맥'] == '...$x$은 최대값이고 $f(x)$을 구한...'
+    assert all('\n' not in row['문맥'] for row in spell_log)
+
+
+def test_from_rows_round_trip(logs):
+    for log in logs:
+        copy = FindingLog.from_rows(list(log))
+        assert list(copy) == list(log)
+        assert copy.reason_counts() == log.reason_counts()
@@ -0,0 +1,51 @@
+# FindingSummary: 같은 오류를 한 행으로 묶어 횟수를 세고, 예시는 자리 (글, 시작, 끝)로 남겨 문맥은 꺼낼 때 만든다
+from collections import Counter
+
+import pytest
+
+from addplusengine import CorrectionPipeline, FindingSummary
+
+TEXT = ' '.join(['$x$은 최대값이다.'] * 5 + ['$f(x)$을 구한다.', '사과은 $3$는 꼭지점이다.'] * 2)
+
+
+@pytest.fixture(scope='module')
+def results():
+    pipeline = CorrectionPipeline()
+    return pipeline.run(TEXT), pipeline.run(TEXT, aggregate=True)
+
+
+def test_groups_match_the_full_log(results):
+    full, summary = results
+    for log, grouped in ((full.josa_log, summary.josa_log), (full.spell_log, summary.spell_log)):
+        assert grouped.total == log.total and grouped.reason_counts() == log.reason_counts()
+        counts = Counter((row['사유'], row['대상'], row['원문'], row['수정']) for row in log)
+        assert {(row['사유'], row['대상'], row['원문'], row['수정']): row['횟수'] for row in grouped} == counts
+        # 많이 나온 오류부터
+        assert [row['횟수'] for row in grouped] == sorted((row['횟수'] for row in grouped), reverse=True)
+
+
+def test_samples_are_locations(results):
+    full, summary = results
+    josa_log = summary.josa_log
+    first = next(iter(josa_log))
+    assert (first['원문'], first['수정'], first['횟수']) == ('은', '는', 5)
+    locations = josa_log.locations()
+    assert len(locations[0]) == 3
+    # 수식 조사 기록의 자리는 교정 전 글 그대로를 가리킨다
+    assert all(text is TEXT and text[start:end].startswith('$x$은') for text, start, end in locations[0])
+    assert first['문맥'] == ' / '.join(josa_log.context(sample)
+                                      for sample in josa_log.groups[('받침 호응 오류', 'x', '은', '는')][1])
+    assert first['문맥'].split(' / ')[0] == full.josa_log[0]['문맥']
+
+
+def test_keeps_only_sampled_texts():
+    summary = FindingSummary(sample_size=2)
+    texts = ['%d번째 글 사과은' % i for i in range(10)]
+    for text in texts:
+        summary.add(text, len(text) - 3, len(text), '사과은', '은', '는', '조사 호응 오류')
+    for text in texts:
+        summary.add_excerpt(text * 50, 3, 6, '글', '글', '글', '다른 사유')
+    assert summary.total == 20 and len(summary) == 2
+    assert len(summary.texts) == 4 and summary.texts[:2] == texts[:2]
+    assert [len(samples) for samples in summary.locations()] == [2, 2]
+    assert [row['문맥'] for row in summary][0] == '...0번째 글 사과은... / ...1번째 글 사과은...'
@@ -0,0 +1,29 @@
+# 엔진을 읽고 교정만 하는 쪽은 numpy/pandas/streamlit을 읽지 않는다 (필요한 기능을 처음 쓸 때 읽는다)
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = '''
+import sys
+import addplusengine
+pipeline = addplusengine.CorrectionPipeline()
+pipeline.run('$x$은 최대값이다.')
+pipeline.run_many(['$f(x)$를 구하시오.'] * 4, workers=2)
+print(' '.join(sorted(name for name in ('numpy', 'pandas', 'streamlit') if name in sys.modules)))
+'''
+
+
+def test_correcting_loads_no_optional_modules():
+    out = subprocess.check_output([sys.executable, '-c', SCRIPT], cwd=ROOT, text=True)
+    assert out.strip() == ''
+
+
+def test_find_josa_errors_without_numpy(monkeypatch):
+    import addplusengine
+    spell = addplusengine.SpellingCorrector()
+    text = '사과은 $x$과 같고 ㉠를 지나는 직선로 간다. 최대값은 달으로'
+    expected = [tuple(row.values()) for row in spell.find_josa_errors(text)]
+    assert len(expected) == 3
+    monkeypatch.setattr(addplusengine, '_numpy', [None])
+    assert [tuple(row.values()) for row in spell.find_josa_errors(text)] == expected
@@ -0,0 +1,57 @@
+# load_ruleset: 다른 판 스크립트의 규칙 표를 코드 실행 없이 리터럴로만 읽는다
+import os
+import textwrap
+
+import pytest
+
+from addplusengine import JosaCorrector, SpellingCorrector, load_ruleset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_script(tmp_path, init_body):
+    path = tmp_path / 'other.py'
+    path.write_text(textwrap.dedent('''
+        class JosaCorrector:
+            def __init__(self):
+                self.protected_words = ['이다']
+                self.batchim_dict = self._init_batchim_dict()
+
+            def _init_batchim_dict(self):
+        ''') + textwrap.indent(textwrap.dedent(init_body), ' ' * 8), encoding='utf-8')
+    return str(path)
+
+
+def test_reads_this_version():
+    tables = load_ruleset(os.path.join(ROOT, 'addplusengine.py'))
+    josa, spell = JosaCorrector(), SpellingCorrector()
+    assert tables['batchim_dict'] == josa.batchim_dict
+    assert tables['unit_batchim_dict'] == josa.unit_batchim_dict
+    assert tables['typo_dict'] == spell.typo_dict
+
+
+def test_reads_literal_dict_with_simple_loops(tmp_path):
+    path = write_script(tmp_path, '''
+        d = {'a': False, 'ㄱ': False}
+        for c in 'ㄱㄴ': d[c] = True
+        for ch in 'ab':
+            if ch not in d: d[ch] = True
+        return d
+    ''')
+    assert load_ruleset(path) == {'protected_words': ['이다'], 'batchim_dict': {'a': False, 'ㄱ': True, 'ㄴ': True, 'b': True}}
+
+
+@pytest.mark.parametrize('init_body', [
+    "return dict(a=True)",
+    "open('touched', 'w')\nreturn {}",
+    "d = {}\nfor c in 'ab': d[c] = len(c)\nreturn d",
+    "d = {}\nfor c in sorted('ab'): d[c] = True\nreturn d",
+    "d = {}\nfor c in 'ab': d[c] = True\nreturn dict(d)",
+    "d = {}\nfor c in 'ab':\n    if c in d: d[c] = True\nreturn d",
+])
+def test_rejects_anything_but_literals(tmp_path, monkeypatch, init_body):
+    monkeypatch.chdir(tmp_path)
+    path = write_script(tmp_path, init_body)
+    with pytest.raises(ValueError, match='_init_batchim_dict'):
+        load_ruleset(path)
+    assert not (tmp_path / 'touched').exists()
@@ -0,0 +1,98 @@
+# MathSpanIndex / LazyMathSpanIndex: 수식 구간 찾기와 이분 탐색 조회
+import random
+
+import pytest
+
+from addplusengine import LazyMathSpanIndex, MathSpan, MathSpanIndex
+
+PIECES = ['$x$', '$$y^2$$', '\\(a\\)', '\\\\(b\\\\)', '\\[c\\]', '\\begin{align*}d\\end{align*}', '$', '$$', '\\$',
+          '\\(', '\\end{equation}', '가나', ' ', '\n', 'abc', '\\,', '{', '}']
+
+
+def random_text(rnd):
+    return ''.join(rnd.choice(PIECES) for _ in range(rnd.randint(0, 25)))
+
+
+def linear_span_at(spans, offset):
+    for span in spans:
+        if span.start <= offset < span.end: return span
+    return None
+
+
+@pytest.mark.parametrize('text, spans', [
+    ('가 $x$ 나', [MathSpan(2, 5, '$', 3, 4)]),
+    ('$$x$$', [MathSpan(0, 5, '$$', 2, 3)]),
+    ('\\(x\\) \\[y\\]', [MathSpan(0, 5, '\\(', 2, 3), MathSpan(6, 11, '\\[', 8, 9)]),
+    ('\\\\(x\\\\)', [MathSpan(0, 7, '\\(', 3, 4)]),
+    ('\\begin{equation*}x\\end{equation*}', [MathSpan(0, 33, 'equation*', 17, 18)]),
+    # \$는 글자, 짝 없는 '$$'는 두 번째 '$'부터 한 개짜리로, 닫히지 않는 종류는 글자로 본다
+    ('\\$5 $x$', [MathSpan(4, 7, '$', 5, 6)]),
+    ('$$x$', [MathSpan(1, 4, '$', 2, 3)]),
+    ('\\(x $y$', [MathSpan(4, 7, '$', 5, 6)]),
+])
+def test_from_text(text, spans):
+    assert list(MathSpanIndex.from_text(text)) == spans
+    assert list(MathSpanIndex.iter_spans(text.encode('utf-8'))) == [
+        MathSpan(*(len(text[:pos].encode('utf-8')) for pos in span[:2]), span.kind,
+                 *(len(text[:pos].encode('utf-8')) for pos in span[3:])) for span in spans]
+
+
+def test_lookup_matches_linear_scan():
+    rnd = random.Random(5)
+    for _ in range(500):
+        text = random_text(rnd)
+        index = MathSpanIndex.from_text(text)
+        spans = list(index)
+        for offset in range(-1, len(text) + 2):
+            assert index.span_at(offset) == linear_span_at(spans, offset), (text, offset)
+            assert index.is_math(offset) == (linear_span_at(spans, offset) is not None)
+        parts = index.split(text)
+        assert ''.join(parts) == text
+        assert parts[1::2] == [text[span.start:span.end] for span in spans]
+
+
+def test_lazy_index_matches_full_scan():
+    # 어떤 순서로 물어도 결과는 처음부터 끝까지 찾은 색인과 같다
+    rnd = random.Random(6)
+    for _ in range(500):
+        text = random_text(rnd)
+        full = MathSpanIndex.from_text(text)
+        lazy = LazyMathSpanIndex(text)
+        offsets = list(range(len(text) + 1))
+        rnd.shuffle(offsets)
+        for offset in offsets[:10]:
+            assert lazy.span_at(offset) == full.span_at(offset), (text, offset)
+        assert list(lazy) == list(full)
+        assert len(lazy) == len(full)
+        assert lazy.kind_counts() == full.kind_counts()
+        assert lazy.split(text) == full.split(text)
+
+
+def test_iterating_lazy_index_reads_ahead_only_as_needed():
+    lazy = LazyMathSpanIndex('$a$ $b$ ' + '$c$ ' * 1000)
+    spans = iter(lazy)
+    assert [next(spans).start, next(spans).start] == [0, 4]
+    assert len(lazy.spans) < 10
+    assert len(lazy) == 1002
+
+
+def test_shifted_matches_rescan():
+    # 수식 밖 한글만 길이가 다른 글로 바꾼 뒤 다시 찾은 구간과 같아야 한다
+    rnd = random.Random(7)
+    for _ in range(300):
+        text = ''.join(rnd.choice(['$x$', '$$y$$', '\\(z\\)', '가나다', '라마']) for _ in range(rnd.randint(0, 20)))
+        index = MathSpanIndex.from_text(text)
+        edits = []
+        pieces = []
+        pos = 0
+        for i, ch in enumerate(text):
+            if '가' <= ch <= '힣' and not index.is_math(i) and rnd.random() < 0.3:
+                replacement = rnd.choice(['', '바사', '아자차'])
+                if replacement == '' and (i == 0 or not '가' <= text[i-1] <= '힣'): continue
+                pieces.append(text[pos:i] + replacement)
+                edits.append((i, len(replacement) - 1))
+                pos = i + 1
+        pieces.append(text[pos:])
+        edited = ''.join(pieces)
+        assert list(index.shifted(edits)) == list(MathSpanIndex.from_text(edited)), (text, edits)
+        assert list(LazyMathSpanIndex(text).shifted(edits)) == list(MathSpanIndex.from_text(edited))
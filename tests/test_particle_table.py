@@ -0,0 +1,57 @@
+# ParticleTable: particle_pairs를 차례로 훑던 예전 판정을 트라이에 미리 채워 둔 것
+import random
+
+import pytest
+
+from addplusengine import JosaCorrector, ParticleTable
+
+
+def walk_pairs(pairs, particle, has_batchim, is_rieul):
+    # 기준 구현: 처음으로 맞는 쌍을 찾아 앞부분을 바꾼다
+    for has_b, no_b in pairs:
+        if particle.startswith(has_b) or particle.startswith(no_b):
+            if has_b == '으로':
+                stem = '으로' if (has_batchim and not is_rieul) else '로'
+            else:
+                stem = has_b if has_batchim else no_b
+            return stem + particle[len(has_b if particle.startswith(has_b) else no_b):]
+    return particle
+
+
+@pytest.fixture(scope='module')
+def pairs():
+    return JosaCorrector().particle_pairs
+
+
+def particles(pairs):
+    rnd = random.Random(8)
+    words = {word for pair in pairs for word in pair}
+    found = {word[:k] + suffix for word in words for k in range(len(word) + 1) for suffix in ('', '는', '도', ' 값')}
+    syllables = sorted({ch for word in words for ch in word}) + ['의', '에', '서', '다']
+    found.update(''.join(rnd.choice(syllables) for _ in range(rnd.randint(1, 5))) for _ in range(3000))
+    return sorted(found)
+
+
+def test_resolve_matches_pair_walk(pairs):
+    table = ParticleTable(pairs)
+    for particle in particles(pairs):
+        for has_batchim in (False, True):
+            for is_rieul in (False, True):
+                expected = walk_pairs(pairs, particle, has_batchim, is_rieul)
+                assert table.resolve(particle, ParticleTable.target_class(has_batchim, is_rieul)) == expected, particle
+
+
+def test_can_change(pairs):
+    table = ParticleTable(pairs)
+    for particle in particles(pairs):
+        changes = any(table.resolve(particle, target_class) != particle for target_class in range(4))
+        assert table.can_change(particle) == changes, particle
+
+
+def test_first_pair_wins():
+    # 앞의 쌍이 뒤의 더 긴 쌍보다 먼저 맞는다 (예전 순서 그대로)
+    table = ParticleTable([('이', '가'), ('이랑', '랑'), ('으로', '로')])
+    assert table.resolve('이랑', ParticleTable.target_class(False, False)) == '가랑'
+    assert table.resolve('랑', ParticleTable.target_class(True, False)) == '이랑'
+    assert table.resolve('로', ParticleTable.target_class(True, True)) == '로'
+    assert table.resolve('의', ParticleTable.target_class(True, False)) == '의'
@@ -0,0 +1,42 @@
+# 규칙 표 지문: 표는 읽기 전용이고, 표를 바꿔 끼우면 지문과 영구 캐시 결과가 따라 바뀐다
+import pytest
+
+from addplusengine import CorrectionPipeline
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    return CorrectionPipeline(cache_path=str(tmp_path / 'cache.sqlite'))
+
+
+def test_tables_cannot_be_changed_in_place(pipeline):
+    josa, spell = pipeline.josa_corrector, pipeline.spell_corrector
+    with pytest.raises(TypeError): josa.batchim_dict['x'] = True
+    with pytest.raises(TypeError): josa.unit_batchim_dict['cm'] = True
+    with pytest.raises(AttributeError): josa.protected_words.append('이 값')
+    with pytest.raises(AttributeError): spell.exceptions.add('사과')
+    with pytest.raises(TypeError): spell.typo_dict['값이'] = '값은'
+
+
+def test_swapped_tables_change_fingerprint_and_cached_results(pipeline):
+    text = '$x$은 최대값이다. 사과은 $a$과 같다.'
+    first = pipeline.run(text)
+    fingerprint, target_fingerprint = pipeline.ruleset_fingerprint(), pipeline.josa_corrector.target_fingerprint()
+    cached = pipeline.run(text)
+    assert (cached.text, list(cached.josa_log), list(cached.spell_log)) == (first.text, list(first.josa_log), list(first.spell_log))
+    assert pipeline.store.stats['results hit'] == 1
+    assert pipeline.ruleset_fingerprint() == fingerprint
+
+    pipeline.spell_corrector.add_typos({'같다': '같음'})
+    assert pipeline.ruleset_fingerprint() != fingerprint
+    assert pipeline.run(text).text.endswith('같음.')
+
+    fingerprint = pipeline.ruleset_fingerprint()
+    pipeline.spell_corrector.set_tables(exceptions=pipeline.spell_corrector.exceptions | {'과은'})
+    assert pipeline.ruleset_fingerprint() != fingerprint
+    assert '사과은' in pipeline.run(text).text
+
+    batchim_dict = dict(pipeline.josa_corrector.batchim_dict, x=True)
+    pipeline.josa_corrector.set_tables(batchim_dict=batchim_dict)
+    assert pipeline.josa_corrector.target_fingerprint() != target_fingerprint
+    assert pipeline.run(text).text.startswith('$x$은')
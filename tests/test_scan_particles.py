@@ -0,0 +1,52 @@
+# scan_formula_particles: 수식 구간마다 그 뒤의 틈과 조사를 한 번 훑어 찾는다 (예전 정규식이 되돌아가며 고르던 결과와 같게)
+import random
+import re
+
+from addplusengine import JosaCorrector, MathSpanIndex
+
+# 예전 master 정규식의 틈 + 조사 부분
+GAP_PARTICLE_RE = re.compile(r'((?:[\s,]|(?:\\[a-zA-Z]+)|(?:\\.)|(?:\$(?:(?:\\[a-zA-Z]+)|(?:\\.)|[\s])*\$))*)'
+                             r'([가-힣\s\.\?\!]+)', re.DOTALL)
+FORMULAS = ['x', 'x^2', '\\frac{1}{2}', 'a_n', '3', '\\alpha', ' ', 'f(x)', '10\\mathrm{cm}', '\\,', 'x,', 'a\\\\b']
+GAPS = ['', ' ', '  ', ',', '\\,', '\\!', '\\quad', '$\\;$', '$ $', '\n']
+TEXTS = ['은 ', '는', '이다.', '으로 ', '과', '.', '?', ' 그리고 ', 'abc ', '{', '}', '\n', '와 값이 ']
+
+
+def regex_matches(text):
+    # 기준 구현: 색인의 구간마다 구간 끝에 정규식을 대어 본다. 이미 읽은 틈/조사 안의 구간은 건너뛴다
+    found = []
+    pos = 0
+    for span in MathSpanIndex.from_text(text):
+        if span.start < pos: continue
+        m = GAP_PARTICLE_RE.match(text, span.end)
+        if m is None:
+            pos = span.end
+            continue
+        found.append((pos, m.end(), text[pos:span.start], text[span.start:span.body_start],
+                      text[span.body_start:span.body_end], text[span.body_end:span.end], m.group(1), m.group(2)))
+        pos = m.end()
+    return found
+
+
+def test_matches_backtracking_regex():
+    # '$' 하나짜리 수식만 쓴다 ('$$'가 겹치거나 \$가 끼면 색인과 예전 정규식의 짝짓기가 다르다)
+    rnd = random.Random(4)
+    josa = JosaCorrector()
+    for _ in range(3000):
+        parts = []
+        for _ in range(rnd.randint(1, 12)):
+            parts.append('$' + rnd.choice(FORMULAS) + '$')
+            parts.append(''.join(rnd.choice(GAPS) for _ in range(rnd.randint(0, 3))))
+            parts.append(rnd.choice(TEXTS) + rnd.choice(TEXTS))
+        text = ''.join(parts)
+        assert list(josa.scan_formula_particles(text)) == regex_matches(text), text
+
+
+def test_long_gaps_and_unclosed_dollar():
+    josa = JosaCorrector()
+    assert list(josa.scan_formula_particles('$x' + ' 값은' * 20000)) == []
+    gap = '\\,' * 20000
+    assert list(josa.scan_formula_particles('$x$' + gap + '은')) == [(0, 3 + len(gap) + 1, '', '$', 'x', '$', gap, '은')]
+    gap = '$\\;$' * 2000
+    text = '가 $x$' + gap + '는 $y$'
+    assert list(josa.scan_formula_particles(text)) == [(0, 5 + len(gap) + 2, '가 ', '$', 'x', '$', gap, '는 ')]
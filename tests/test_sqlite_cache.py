@@ -0,0 +1,52 @@
+# SQLiteCache: 쓴 항목은 바로 commit되어 다른 연결/다음 프로세스가 본다. 파이프라인은 close()/with로 연결을 닫는다
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+from addplusengine import CorrectionPipeline, JosaCorrector, SQLiteCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rows(path, table):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_targets_are_committed_without_a_pipeline(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    josa = JosaCorrector()
+    josa.persistent_cache = SQLiteCache(path)
+    for formula in ('x', 'f(x)', 'a_{n+1}', '\\frac{1}{2}'):
+        josa.find_target(formula)
+    assert rows(path, 'targets') == 4
+
+
+def test_entries_survive_an_exit_mid_batch(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    script = ('import os, addplusengine\n'
+              'pipeline = addplusengine.CorrectionPipeline(cache_path=%r)\n'
+              'for doc in ["$x$은 값이다.", "$f(x)$를 구한다.", "$a_n$이 있다."]: pipeline.run(doc)\n'
+              'os._exit(0)\n' % path)
+    subprocess.check_call([sys.executable, '-c', script], cwd=ROOT)
+    assert rows(path, 'results') == 3 and rows(path, 'targets') == 3
+    with CorrectionPipeline(cache_path=path) as pipeline:
+        pipeline.run('$f(x)$를 구한다.')
+        assert pipeline.store.stats['results hit'] == 1
+
+
+def test_close_detaches_the_cache(tmp_path):
+    with CorrectionPipeline(cache_path=str(tmp_path / 'cache.sqlite')) as pipeline:
+        store = pipeline.store
+        first = pipeline.run('$x$은 최대값이다.')
+    assert pipeline.store is None and pipeline.josa_corrector.persistent_cache is None
+    assert pipeline.run('$x$은 최대값이다.').text == first.text
+    pipeline.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        store.get_target('', 'x')
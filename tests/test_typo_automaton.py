@@ -0,0 +1,78 @@
+# TypoAutomaton.match: 가장 왼쪽, 같은 위치면 조건을 만족하는 가장 긴 규칙 (겹치지 않게 앞에서부터)
+import random
+import re
+
+import pytest
+
+from addplusengine import SpellingCorrector, TextRule, TypoAutomaton
+
+
+def brute_force(typo_dict, rules, text):
+    # 위치마다 긴 것부터 모든 길이를 대 보는 기준 구현. 같은 패턴이면 조건 있는 규칙을 더한 순서로, 그다음 조건 없는 마지막 규칙
+    entries = {wrong: [TextRule(wrong, correct)] for wrong, correct in typo_dict.items() if wrong}
+    for rule in rules:
+        if not rule.pattern: continue
+        existing = entries.setdefault(rule.pattern, [])
+        if rule.before is None and rule.after is None:
+            entries[rule.pattern] = [r for r in existing if r.before is not None or r.after is not None] + [rule]
+        else:
+            conditional = [r for r in existing if r.before is not None or r.after is not None]
+            entries[rule.pattern] = conditional + [rule] + [r for r in existing if r.before is None and r.after is None]
+    found = []
+    i = 0
+    while i < len(text):
+        hit = None
+        for size in range(len(text) - i, 0, -1):
+            for rule in entries.get(text[i:i + size], ()):
+                # 앞 조건은 text[:i]의 끝에서, 뒤 조건은 text[i + size:]의 처음에서 맞아야 한다
+                if ((rule.before is None or re.search('(?:%s)\\Z' % rule.before, text[:i]))
+                        and (rule.after is None or re.compile(rule.after).match(text, i + size))):
+                    hit = (i, i + size, rule)
+                    break
+            if hit: break
+        if hit:
+            found.append(hit)
+            i = hit[1]
+        else:
+            i += 1
+    return found
+
+
+def test_match_is_leftmost_longest():
+    rnd = random.Random(10)
+    for _ in range(3000):
+        alphabet = 'abc' if rnd.random() < 0.5 else 'ab가'
+        word = lambda: ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 4)))
+        typo_dict = {word(): 'X' for _ in range(rnd.randint(0, 8))}
+        rules = []
+        for _ in range(rnd.randint(0, 3)):
+            before = rnd.choice([None, '(?<!a)', '(?<![가-힣])', 'a', 'b[ac]', '가'])
+            after = rnd.choice([None, '(?!b)', '(?![가-힣])', 'b', '[a가]c'])
+            rules.append(TextRule(word(), 'Y%d' % len(rules), before=before, after=after))
+        text = ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 30)))
+        automaton = TypoAutomaton(typo_dict, rules)
+        assert automaton.match(text) == brute_force(typo_dict, rules, text), (typo_dict, rules, text)
+        assert automaton.find(text) == [(start, end) for start, end, _ in automaton.match(text)]
+
+
+def test_match_prefers_longest_at_the_same_start():
+    automaton = TypoAutomaton({'최대': '최대', '최대값': '최댓값', '값이': '값이'})
+    assert automaton.find('최대값이 최대') == [(0, 3), (5, 7)]
+
+
+def test_conditions_that_consume_text():
+    # 글자를 먹는 조건은 pattern 바로 앞(끝이 pattern 시작에 닿는 글)/바로 뒤 글에 대어 본다
+    rules = [TextRule('갯수', '개수', before='몇 '), TextRule('값', '값', reason='뒤', after='[0-9]+개')]
+    automaton = TypoAutomaton({}, rules)
+    assert automaton.find('몇 갯수와 갯수') == [(2, 4)]
+    assert automaton.find('갯수 몇') == []
+    assert [rule.reason for _, _, rule in automaton.match('값3개 값 값x')] == ['뒤']
+
+
+def test_before_condition_must_have_a_fixed_width():
+    with pytest.raises(re.error):
+        TypoAutomaton({}, [TextRule('값', '값', before='\\s+')])
+    spell = SpellingCorrector()
+    with pytest.raises(re.error):
+        spell.add_rules([{'pattern': '값', 'replace': '값', 'before': '[가-힣]*'}])
+    assert spell.text_rules == ()